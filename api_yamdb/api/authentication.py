@@ -0,0 +1,241 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from reviews.models import UserRoleMixin
+
+from .cache import get_cache
+from .tokens import ROLE_CLAIMS, ROLE_VERSION_CLAIM
+
+User = get_user_model()
+
+# поля пользователя, которых достаточно для проверки прав доступа
+USER_SNAPSHOT_FIELDS = (
+    'id', 'username', 'role', 'is_staff', 'is_superuser', 'is_active',
+)
+USER_KEY = 'api:user:{user_id}'
+# счетчик изменений пользователей в общем кэше: увидев новое значение,
+# процесс сбрасывает свой LRU
+USER_GENERATION_KEY = 'api:user:generation'
+ROLE_VERSION_KEY = 'api:role_version:{user_id}'
+
+
+class UserSnapshotCache:
+    """
+    Кэш снимков пользователей: LRU в памяти процесса с ограниченным
+    временем жизни и, если задан AUTH_USER_CACHE_ALIAS, общий кэш
+    для всех процессов.
+
+    При сохранении пользователя снимок удаляется из общего кэша
+    и из памяти текущего процесса. Остальные процессы узнают об этом
+    по счетчику USER_GENERATION_KEY в общем кэше, который проверяют
+    не чаще раза в AUTH_USER_CACHE_CHECK_INTERVAL секунд. Без общего
+    кэша снимок в других процессах живет до AUTH_USER_CACHE_TIMEOUT.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+        self._generation = None
+        self._checked_at = None
+
+    def get_shared_cache(self):
+        if settings.AUTH_USER_CACHE_ALIAS is None:
+            return None
+        return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+    def get(self, user_id):
+        shared_cache = self.get_shared_cache()
+        if shared_cache is not None:
+            self._check_generation(shared_cache)
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is not None:
+                expires, snapshot = item
+                if expires > time.monotonic():
+                    self._items.move_to_end(user_id)
+                    return snapshot
+                del self._items[user_id]
+        if shared_cache is None:
+            return None
+        snapshot = shared_cache.get(USER_KEY.format(user_id=user_id))
+        if snapshot is not None:
+            self._set_local(user_id, snapshot)
+        return snapshot
+
+    def set(self, user_id, snapshot):
+        self._set_local(user_id, snapshot)
+        shared_cache = self.get_shared_cache()
+        if shared_cache is not None:
+            shared_cache.set(
+                USER_KEY.format(user_id=user_id), snapshot,
+                timeout=settings.AUTH_USER_SHARED_CACHE_TIMEOUT,
+            )
+
+    def delete(self, user_id):
+        with self._lock:
+            self._items.pop(user_id, None)
+        shared_cache = self.get_shared_cache()
+        if shared_cache is not None:
+            shared_cache.delete(USER_KEY.format(user_id=user_id))
+            self._bump_generation(shared_cache)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._checked_at = None
+
+    def _check_generation(self, shared_cache):
+        """Сбрасывает LRU, если пользователей меняли в другом процессе."""
+        now = time.monotonic()
+        checked_at = self._checked_at
+        if (
+            checked_at is not None
+            and now - checked_at < settings.AUTH_USER_CACHE_CHECK_INTERVAL
+        ):
+            return
+        generation = shared_cache.get(USER_GENERATION_KEY)
+        with self._lock:
+            if checked_at is not None and generation != self._generation:
+                self._items.clear()
+            self._generation = generation
+            self._checked_at = now
+
+    def _bump_generation(self, shared_cache):
+        if shared_cache.add(USER_GENERATION_KEY, 1, timeout=None):
+            return
+        try:
+            shared_cache.incr(USER_GENERATION_KEY)
+        except ValueError:
+            # ключ вытеснен между add и incr
+            shared_cache.add(USER_GENERATION_KEY, 1, timeout=None)
+
+    def _set_local(self, user_id, snapshot):
+        expires = time.monotonic() + settings.AUTH_USER_CACHE_TIMEOUT
+        with self._lock:
+            self._items[user_id] = (expires, snapshot)
+            self._items.move_to_end(user_id)
+            while len(self._items) > settings.AUTH_USER_CACHE_SIZE:
+                self._items.popitem(last=False)
+
+
+user_cache = UserSnapshotCache()
+
+
+def build_user(snapshot):
+    """
+    Собирает пользователя из снимка. Остальные поля отложены
+    и загрузятся из БД только при обращении к ним.
+    """
+    # from_db ожидает значения в порядке полей модели
+    values = dict(zip(USER_SNAPSHOT_FIELDS, snapshot))
+    field_names = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    return User.from_db(
+        router.db_for_read(User),
+        field_names,
+        [values[name] for name in field_names],
+    )
+
+
+def get_role_version(user_id):
+    """
+    Текущая версия прав пользователя, None - если пользователя нет.
+    Версия кэшируется не дольше JWT_ROLE_VERSION_TIMEOUT секунд:
+    кэш API может быть своим у каждого процесса, и изменение прав,
+    сделанное в другом процессе, здесь увидится только из БД.
+    """
+    cache = get_cache()
+    key = ROLE_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list(
+            'role_version', flat=True
+        ).first()
+        if version is None:
+            return None
+        cache.add(key, version, timeout=settings.JWT_ROLE_VERSION_TIMEOUT)
+    return version
+
+
+def set_role_version(user_id, version):
+    get_cache().set(
+        ROLE_VERSION_KEY.format(user_id=user_id), version,
+        timeout=settings.JWT_ROLE_VERSION_TIMEOUT,
+    )
+
+
+def forget_role_version(user_id):
+    get_cache().delete(ROLE_VERSION_KEY.format(user_id=user_id))
+
+
+class TokenRoleUser(UserRoleMixin, TokenUser):
+    """Пользователь, собранный из утверждений о правах в JWT."""
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication, которая берет пользователя из кэша снимков,
+    а не из БД на каждый запрос.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+
+        if settings.JWT_ROLE_CLAIMS and all(
+            claim in validated_token
+            for claim in (*ROLE_CLAIMS, ROLE_VERSION_CLAIM)
+        ):
+            return self.get_token_user(user_id, validated_token)
+
+        snapshot = user_cache.get(user_id)
+        if snapshot is None:
+            snapshot = User.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values_list(*USER_SNAPSHOT_FIELDS).first()
+            if snapshot is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found'
+                )
+            user_cache.set(user_id, snapshot)
+
+        user = build_user(snapshot)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
+
+    def get_token_user(self, user_id, validated_token):
+        """
+        Пользователь из утверждений токена. Токен, выданный до смены
+        прав пользователя или до его удаления, не принимается.
+        """
+        if validated_token[ROLE_VERSION_CLAIM] != get_role_version(user_id):
+            raise AuthenticationFailed(
+                'Права пользователя изменились, получите новый токен',
+                code='role_changed',
+            )
+        return TokenRoleUser(validated_token)
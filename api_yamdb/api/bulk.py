@@ -0,0 +1,312 @@
+from django.conf import settings
+from django.db import connection, transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+from reviews.models import Category, Genre, Title
+from reviews.signals import models_bulk_changed
+
+from .permissions import IsAdminOrSuperUser
+from .serializers import TitleBulkSerializer
+
+CREATED_STATUS = 'created'
+UPDATED_STATUS = 'updated'
+DELETED_STATUS = 'deleted'
+ERROR_STATUS = 'error'
+
+
+def validate_items(serializer_class, items, partial=False):
+    """
+    Проверяет каждый объект сериализатором без обращений к БД:
+    проверки уникальности выполняются потом одним запросом на пачку.
+    Возвращает проверенные данные и ошибки по номерам объектов.
+    """
+    validated, errors = {}, {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = {'non_field_errors': ['Ожидался объект']}
+            continue
+        serializer = serializer_class(data=item, partial=partial)
+        for field in serializer.fields.values():
+            field.validators = [
+                validator for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        if serializer.is_valid():
+            validated[index] = serializer.validated_data
+        else:
+            errors[index] = serializer.errors
+    return validated, errors
+
+
+def add_error(errors, index, field, message):
+    errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+
+def get_ids_by_slug(model, slugs):
+    """Id объектов по слагам одним запросом."""
+    return dict(
+        model.objects.filter(slug__in=set(slugs)).values_list('slug', 'id')
+    )
+
+
+def error_response(errors):
+    return Response(
+        {'results': [
+            {'index': index, 'status': ERROR_STATUS, 'errors': errors[index]}
+            for index in sorted(errors)
+        ]},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+def results_response(results, status_code=status.HTTP_200_OK):
+    return Response(
+        {'results': [
+            {'index': index, **result} for index, result in enumerate(results)
+        ]},
+        status=status_code
+    )
+
+
+class BulkMixin():
+    """
+    Массовые операции /bulk/: POST - создание, PATCH - изменение,
+    DELETE - удаление списка объектов. Запись идет одной транзакцией
+    и только если все объекты прошли проверку; иначе возвращается 400
+    с ошибками по номерам объектов. Ответ - результат по каждому объекту.
+    """
+
+    @action(detail=False, methods=['post', 'patch', 'delete'],
+            permission_classes=[IsAdminOrSuperUser])
+    def bulk(self, request):
+        items = self.get_bulk_items(request.data)
+        handler = {
+            'POST': self.create_items,
+            'PATCH': self.update_items,
+            'DELETE': self.delete_items,
+        }[request.method]
+        return handler(items)
+
+    def get_bulk_items(self, data):
+        if not isinstance(data, list) or not data:
+            raise ValidationError('Ожидался непустой список объектов')
+        if len(data) > settings.API_BULK_MAX_ITEMS:
+            raise ValidationError(
+                f'Не больше {settings.API_BULK_MAX_ITEMS} объектов за запрос'
+            )
+        return data
+
+    def get_existing(self, keys, field_name, errors):
+        """Объекты по ключам одним запросом, для отсутствующих - ошибки."""
+        existing = self.bulk_model.objects.in_bulk(
+            set(keys.values()), field_name=field_name
+        )
+        for index, key in keys.items():
+            if key not in existing:
+                add_error(errors, index, field_name, 'Объект не найден')
+        return existing
+
+    def get_keys(self, items, field_name, errors):
+        """Ключи объектов для изменения и удаления, без повторов."""
+        keys = {}
+        for index, item in enumerate(items):
+            key = item.get(field_name) if isinstance(item, dict) else item
+            if key is None:
+                add_error(errors, index, field_name, 'Обязательное поле')
+            elif (not isinstance(key, self.bulk_key_type)
+                  or isinstance(key, bool)):
+                add_error(errors, index, field_name, 'Неверное значение')
+            elif key in keys.values():
+                add_error(errors, index, field_name, 'Объект указан дважды')
+            else:
+                keys[index] = key
+        return keys
+
+    def delete_items(self, items):
+        errors = {}
+        keys = self.get_keys(items, self.bulk_key, errors)
+        existing = self.get_existing(keys, self.bulk_key, errors)
+        if errors:
+            return error_response(errors)
+        with transaction.atomic():
+            self.bulk_model.objects.filter(
+                pk__in=[obj.pk for obj in existing.values()]
+            ).delete()
+        return results_response([
+            {self.bulk_key: keys[index], 'status': DELETED_STATUS}
+            for index in range(len(items))
+        ])
+
+
+class SlugBulkMixin(BulkMixin):
+    """Массовые операции для жанров и категорий, ключ - слаг."""
+    bulk_key = 'slug'
+    bulk_key_type = str
+
+    @property
+    def bulk_model(self):
+        return self.get_queryset().model
+
+    def create_items(self, items):
+        validated, errors = validate_items(self.get_serializer_class(), items)
+        slugs = {}
+        for index, data in validated.items():
+            if data['slug'] in slugs.values():
+                add_error(errors, index, 'slug', 'Слаг указан дважды')
+            slugs[index] = data['slug']
+        taken = get_ids_by_slug(self.bulk_model, slugs.values())
+        for index, slug in slugs.items():
+            if slug in taken:
+                add_error(errors, index, 'slug', 'Слаг уже существует')
+        if errors:
+            return error_response(errors)
+        with transaction.atomic():
+            self.bulk_model.objects.bulk_create(
+                self.bulk_model(**validated[index])
+                for index in range(len(items))
+            )
+            models_bulk_changed.send(sender=self.bulk_model)
+        return results_response(
+            [{'slug': slug, 'status': CREATED_STATUS}
+             for slug in slugs.values()],
+            status.HTTP_201_CREATED
+        )
+
+    def update_items(self, items):
+        errors = {}
+        keys = self.get_keys(items, 'slug', errors)
+        existing = self.get_existing(keys, 'slug', errors)
+        # слаг не меняется, меняется только название
+        validated, item_errors = validate_items(
+            self.get_serializer_class(),
+            [
+                {'name': item.get('name'), 'slug': item.get('slug')}
+                if isinstance(item, dict) else item for item in items
+            ],
+        )
+        for index, item_error in item_errors.items():
+            errors.setdefault(index, {}).update(item_error)
+        if errors:
+            return error_response(errors)
+        objs = []
+        for index, slug in keys.items():
+            obj = existing[slug]
+            obj.name = validated[index]['name']
+            objs.append(obj)
+        with transaction.atomic():
+            self.bulk_model.objects.bulk_update(objs, ['name'])
+            models_bulk_changed.send(sender=self.bulk_model)
+        return results_response([
+            {'slug': keys[index], 'status': UPDATED_STATUS}
+            for index in range(len(items))
+        ])
+
+
+class TitleBulkMixin(BulkMixin):
+    """
+    Массовые операции для произведений. Слаги жанров и категорий
+    всей пачки проверяются одним запросом на каждую модель,
+    жанры записываются одной вставкой в промежуточную таблицу.
+    """
+    bulk_model = Title
+    bulk_key = 'id'
+    bulk_key_type = int
+
+    def resolve_slugs(self, validated, errors):
+        """Заменяет слаги жанров и категорий на id."""
+        genres = get_ids_by_slug(Genre, (
+            slug for data in validated.values()
+            for slug in data.get('genre', ())
+        ))
+        categories = get_ids_by_slug(Category, (
+            data['category'] for data in validated.values()
+            if 'category' in data
+        ))
+        for index, data in validated.items():
+            if 'genre' in data:
+                unknown = set(data['genre']) - set(genres)
+                if unknown:
+                    add_error(errors, index, 'genre', (
+                        f'Жанры не найдены: {", ".join(sorted(unknown))}'
+                    ))
+                data['genre'] = {genres.get(slug) for slug in data['genre']}
+            if 'category' in data:
+                if data['category'] not in categories:
+                    add_error(
+                        errors, index, 'category', 'Категория не найдена'
+                    )
+                data['category_id'] = categories.get(data.pop('category'))
+
+    def set_genres(self, titles_genres, clear=False):
+        """Записывает жанры произведений одной вставкой."""
+        through = Title.genre.through
+        if clear:
+            through.objects.filter(
+                title_id__in=[title.pk for title, _ in titles_genres]
+            ).delete()
+        through.objects.bulk_create(
+            through(title_id=title.pk, genre_id=genre_id)
+            for title, genre_ids in titles_genres
+            for genre_id in genre_ids
+        )
+
+    def create_items(self, items):
+        validated, errors = validate_items(TitleBulkSerializer, items)
+        self.resolve_slugs(validated, errors)
+        if errors:
+            return error_response(errors)
+        titles_genres = []
+        for index in range(len(items)):
+            data = dict(validated[index])
+            genre_ids = data.pop('genre')
+            titles_genres.append((Title(**data), genre_ids))
+        titles = [title for title, _ in titles_genres]
+        with transaction.atomic():
+            if connection.features.can_return_ids_from_bulk_insert:
+                Title.objects.bulk_create(titles)
+            else:
+                # без RETURNING id новых строк не узнать
+                for title in titles:
+                    title.save()
+            self.set_genres(titles_genres)
+            models_bulk_changed.send(sender=Title)
+        return results_response(
+            [{'id': title.pk, 'status': CREATED_STATUS} for title in titles],
+            status.HTTP_201_CREATED
+        )
+
+    def update_items(self, items):
+        errors = {}
+        keys = self.get_keys(items, 'id', errors)
+        existing = self.get_existing(keys, 'id', errors)
+        validated, item_errors = validate_items(
+            TitleBulkSerializer, items, partial=True
+        )
+        for index, item_error in item_errors.items():
+            errors.setdefault(index, {}).update(item_error)
+        self.resolve_slugs(validated, errors)
+        if errors:
+            return error_response(errors)
+        fields = set()
+        titles_genres = []
+        for index, key in keys.items():
+            title = existing[key]
+            data = dict(validated[index])
+            if 'genre' in data:
+                titles_genres.append((title, data.pop('genre')))
+            for field, value in data.items():
+                setattr(title, field, value)
+            fields.update(data)
+        with transaction.atomic():
+            if fields:
+                Title.objects.bulk_update(existing.values(), fields)
+            if titles_genres:
+                self.set_genres(titles_genres, clear=True)
+            models_bulk_changed.send(sender=Title)
+        return results_response([
+            {'id': keys[index], 'status': UPDATED_STATUS}
+            for index in range(len(items))
+        ])
@@ -0,0 +1,100 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'api:version:{resource}'
+MODIFIED_KEY = 'api:modified:{resource}'
+RESPONSE_KEY = 'api:response:{versions}:{role}:{digest}'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _now_version():
+    # номер поколения растет от текущего времени в миллисекундах:
+    # так он не повторяется после вытеснения ключа из кэша.
+    # При частых изменениях он может обогнать часы, поэтому
+    # время изменения хранится отдельно (MODIFIED_KEY)
+    return int(time.time() * 1000)
+
+
+def get_versions(*resources):
+    """
+    Возвращает текущие номера поколений ресурсов и время
+    их последнего изменения в миллисекундах - одним запросом к кэшу.
+    """
+    cache = get_cache()
+    version_keys = [VERSION_KEY.format(resource=name) for name in resources]
+    modified_keys = [
+        MODIFIED_KEY.format(resource=name) for name in resources
+    ]
+    values = cache.get_many(version_keys + modified_keys)
+    for key in version_keys + modified_keys:
+        if key not in values:
+            cache.add(key, _now_version(), timeout=None)
+            values[key] = cache.get(key)
+    return (
+        [values[key] for key in version_keys],
+        [values[key] for key in modified_keys],
+    )
+
+
+def bump_version(*resources):
+    """Увеличивает номер поколения ресурсов - старые ответы устаревают."""
+    cache = get_cache()
+    for name in resources:
+        key = VERSION_KEY.format(resource=name)
+        current = cache.get(key)
+        added = current is None and cache.add(
+            key, _now_version(), timeout=None
+        )
+        if not added:
+            try:
+                cache.incr(key, max(_now_version() - (current or 0), 1))
+            except ValueError:
+                cache.add(key, _now_version(), timeout=None)
+        cache.set(
+            MODIFIED_KEY.format(resource=name), _now_version(), timeout=None
+        )
+
+
+def last_modified(modified):
+    """Время последнего изменения ресурсов, в секундах."""
+    return max(modified) // 1000
+
+
+def get_role(request):
+    """Роль пользователя, от которой может зависеть содержимое ответа."""
+    user = request.user
+    if not user.is_authenticated:
+        return 'anonymous'
+    if user.is_admin or user.is_superuser:
+        return 'admin'
+    return user.role
+
+
+def make_response_key(request, versions):
+    """
+    Ключ ответа: версии ресурсов, роль и полный адрес запроса.
+    Схема и хост входят в ключ, потому что ссылки next/previous
+    в ответе абсолютные.
+    """
+    digest = hashlib.md5(
+        request.build_absolute_uri().encode('utf-8')
+    ).hexdigest()
+    return RESPONSE_KEY.format(
+        versions='.'.join(str(version) for version in versions),
+        role=get_role(request),
+        digest=digest,
+    )
+
+
+def make_etag(response_key, renderer_format):
+    """Сильный ETag из ключа ответа, без хэширования тела ответа."""
+    digest = hashlib.md5(
+        f'{response_key}:{renderer_format}'.encode('utf-8')
+    ).hexdigest()
+    return f'"{digest}"'
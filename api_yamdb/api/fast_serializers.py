@@ -0,0 +1,128 @@
+from collections import defaultdict
+from operator import itemgetter
+
+from rest_framework import serializers
+from reviews.models import Genre
+
+
+class ValuesListSerializer():
+    """
+    Сериализатор списков только для чтения. Строки читаются
+    через .values(), модели и поля ModelSerializer для каждого объекта
+    не создаются, ответ собирается из словарей. JSON совпадает
+    с ответом соответствующего ModelSerializer.
+
+    fields: поле ответа -> колонки .values(), нужные для него,
+    в порядке полей ModelSerializer. Значение поля берется методом
+    get_<поле>(row), а если его нет - из одноименной колонки.
+    """
+    fields = {}
+
+    def __init__(self, context=None):
+        selected = (context or {}).get('selected_fields')
+        self.field_names = [
+            name for name in self.fields
+            if selected is None or name in selected
+        ]
+
+    def get_values(self, queryset, extra_columns=()):
+        """Queryset строк со всеми колонками выбранных полей."""
+        columns = set(extra_columns)
+        for name in self.field_names:
+            columns.update(self.fields[name])
+        return queryset.prefetch_related(None).values(*columns)
+
+    def prepare(self, rows):
+        """Подгружает данные для всей страницы, например связи M2M."""
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        self.prepare(rows)
+        getters = [
+            (name, getattr(self, f'get_{name}', None) or itemgetter(name))
+            for name in self.field_names
+        ]
+        return [
+            {name: getter(row) for name, getter in getters} for row in rows
+        ]
+
+
+class TitleValuesSerializer(ValuesListSerializer):
+    """Список произведений, как в TitleBaseSerializer."""
+    fields = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating_sum', 'rating_count'),
+        'description': ('description',),
+        'genre': ('id',),
+        'category': ('category_id', 'category__name', 'category__slug'),
+    }
+
+    genres = None
+
+    def prepare(self, rows):
+        if 'genre' not in self.field_names:
+            return
+        # тот же запрос, что делает prefetch_related('genre')
+        self.genres = defaultdict(list)
+        title_genres = Genre.objects.filter(
+            titles__in=[row['id'] for row in rows]
+        ).values_list('titles', 'name', 'slug')
+        for title_id, name, slug in title_genres:
+            self.genres[title_id].append({'name': name, 'slug': slug})
+
+    def get_rating(self, row):
+        # IntegerField отбрасывает дробную часть средней оценки
+        if not row['rating_count']:
+            return None
+        return int(row['rating_sum'] / row['rating_count'])
+
+    def get_genre(self, row):
+        return self.genres.get(row['id'], [])
+
+    def get_category(self, row):
+        if row['category_id'] is None:
+            return None
+        return {'name': row['category__name'], 'slug': row['category__slug']}
+
+
+class FeedValuesSerializer(ValuesListSerializer):
+    """Общее для отзывов и комментариев: автор и дата публикации."""
+    # дата форматируется тем же полем DRF, что и в ModelSerializer
+    date_field = serializers.DateTimeField()
+
+    def get_author(self, row):
+        return row['author__username']
+
+    def get_pub_date(self, row):
+        return self.date_field.to_representation(row['pub_date'])
+
+
+class ReviewValuesSerializer(FeedValuesSerializer):
+    """Список отзывов, как в ReviewSerializer."""
+    fields = {
+        'id': ('id',),
+        'author': ('author__username',),
+        'title': ('title_id',),
+        'text': ('text',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+    }
+
+    def get_title(self, row):
+        return row['title_id']
+
+
+class CommentValuesSerializer(FeedValuesSerializer):
+    """Список комментариев, как в CommentSerializer."""
+    fields = {
+        'id': ('id',),
+        'author': ('author__username',),
+        'review': ('review_id',),
+        'text': ('text',),
+        'pub_date': ('pub_date',),
+    }
+
+    def get_review(self, row):
+        return row['review_id']
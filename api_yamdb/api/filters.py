@@ -1,5 +1,6 @@
 from django_filters import rest_framework as filters
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(filters.FilterSet):
@@ -9,7 +10,11 @@ class TitleFilter(filters.FilterSet):
     category = filters.CharFilter(field_name='category__slug',)
     name = filters.CharFilter(field_name='name', lookup_expr='icontains',)
     year = filters.NumberFilter(field_name='year')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year',)
+        fields = ('category', 'genre', 'name', 'year', 'search',)
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,94 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Category, Genre, Title
+
+from ...renderers import FastJSONParser, FastJSONRenderer
+from ...serializers import TitleBaseSerializer
+
+
+class Command(BaseCommand):
+    """
+    Сравнивает скорость JSONRenderer DRF и FastJSONRenderer
+    на выдаче TitleBaseSerializer. Тестовые произведения создаются
+    в транзакции, которая затем откатывается.
+    """
+    help = 'benchmark JSON renderers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--titles',
+            type=int,
+            default=1000,
+            help='Количество произведений в одном ответе',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=50,
+            help='Сколько раз рендерить ответ каждым рендерером',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            data = self._get_data(options['titles'])
+            transaction.set_rollback(True)
+        expected = JSONRenderer().render(data)
+        if FastJSONRenderer().render(data) != expected:
+            raise RuntimeError('Renderers produce different output')
+        if FastJSONParser().parse(io.BytesIO(expected)) != data:
+            raise RuntimeError('Parsed data differs from rendered data')
+        self.stdout.write(
+            f'{options["titles"]} titles, {len(expected) / 1024:.0f} KiB'
+        )
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            elapsed = self._run(renderer, data, options['repeat'])
+            self.stdout.write(
+                f'{type(renderer).__name__}: '
+                f'{options["repeat"] / elapsed:.1f} renders/s, '
+                f'{len(expected) * options["repeat"] / elapsed / 2**20:.1f}'
+                f' MiB/s'
+            )
+
+    def _get_data(self, count):
+        category = Category.objects.create(
+            name='Категория', slug='bench-render'
+        )
+        genres = [
+            Genre.objects.create(name=f'Жанр {number}',
+                                 slug=f'bench-render-{number}')
+            for number in range(3)
+        ]
+        Title.objects.bulk_create(
+            Title(
+                name=f'bench_render_{number}',
+                year=2000,
+                description='Описание произведения «в кавычках»',
+                category=category,
+                rating_sum=number % 10 + 1,
+                rating_count=1,
+            )
+            for number in range(count)
+        )
+        titles = Title.objects.filter(
+            name__startswith='bench_render_'
+        ).order_by('pk')
+        through = Title.genre.through
+        through.objects.bulk_create(
+            through(title_id=title_id, genre_id=genre.pk)
+            for title_id in titles.values_list('pk', flat=True)
+            for genre in genres[:2]
+        )
+        return TitleBaseSerializer(
+            titles.select_related('category').prefetch_related('genre'),
+            many=True,
+        ).data
+
+    def _run(self, renderer, data, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            renderer.render(data)
+        return time.perf_counter() - started
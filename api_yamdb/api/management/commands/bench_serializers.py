@@ -0,0 +1,160 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.models import Category, Comment, Genre, Review, Title
+
+from ...fast_serializers import (CommentValuesSerializer,
+                                 ReviewValuesSerializer, TitleValuesSerializer)
+from ...serializers import (CommentSerializer, ReviewSerializer,
+                            TitleBaseSerializer)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Сравнивает скорость сериализации страницы списка ModelSerializer
+    и сериализаторами на .values(): произведения, отзывы, комментарии.
+    Время включает запросы к БД. Тестовые данные создаются
+    в транзакции, которая затем откатывается.
+    """
+    help = 'benchmark list serializers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=1000,
+            help='Количество объектов на странице',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Сколько раз сериализовать страницу',
+        )
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        with transaction.atomic():
+            title, review = self._create_data(page_size)
+            cases = [
+                (
+                    'titles',
+                    Title.objects.filter(
+                        name__startswith='bench_serializers_'
+                    ).select_related('category').prefetch_related('genre'),
+                    TitleBaseSerializer,
+                    TitleValuesSerializer,
+                ),
+                (
+                    'reviews',
+                    Review.objects.filter(title=title).select_related(
+                        'author'
+                    ),
+                    ReviewSerializer,
+                    ReviewValuesSerializer,
+                ),
+                (
+                    'comments',
+                    Comment.objects.filter(review=review).select_related(
+                        'author'
+                    ),
+                    CommentSerializer,
+                    CommentValuesSerializer,
+                ),
+            ]
+            for name, queryset, serializer_class, values_class in cases:
+                queryset = queryset.order_by('pk')
+                model_data = self._model_page(
+                    serializer_class, queryset, page_size
+                )
+                values_data = self._values_page(
+                    values_class, queryset, page_size
+                )
+                if values_data != model_data:
+                    raise RuntimeError(f'{name}: serializers differ')
+                for label, function, serializer in (
+                    ('ModelSerializer', self._model_page, serializer_class),
+                    ('values()', self._values_page, values_class),
+                ):
+                    elapsed = self._run(
+                        function, serializer, queryset, page_size,
+                        options['repeat'],
+                    )
+                    self.stdout.write(
+                        f'{name} {label}: '
+                        f'{page_size * options["repeat"] / elapsed:.0f}'
+                        f' objects/s'
+                    )
+            transaction.set_rollback(True)
+
+    def _create_data(self, count):
+        category = Category.objects.create(
+            name='Категория', slug='bench-serializers'
+        )
+        genres = [
+            Genre.objects.create(name=f'Жанр {number}',
+                                 slug=f'bench-serializers-{number}')
+            for number in range(2)
+        ]
+        Title.objects.bulk_create(
+            Title(
+                name=f'bench_serializers_{number}',
+                year=2000,
+                description='Описание произведения',
+                category=category,
+                rating_sum=number % 10 + 1,
+                rating_count=1,
+            )
+            for number in range(count)
+        )
+        titles = Title.objects.filter(name__startswith='bench_serializers_')
+        through = Title.genre.through
+        through.objects.bulk_create(
+            through(title_id=title_id, genre_id=genre.pk)
+            for title_id in titles.values_list('pk', flat=True)
+            for genre in genres
+        )
+        # отзыв можно оставить один раз, поэтому у каждого свой автор
+        password = make_password(None)
+        User.objects.bulk_create(
+            User(
+                username=f'bench_serializers_{number}',
+                email=f'bench_serializers_{number}@yamdb.fake',
+                password=password,
+            )
+            for number in range(count)
+        )
+        authors = list(User.objects.filter(
+            username__startswith='bench_serializers_'
+        ).values_list('pk', flat=True))
+        title = titles.first()
+        Review.objects.bulk_create(
+            Review(title=title, author_id=author_id, text='Отзыв', score=7)
+            for author_id in authors
+        )
+        review = Review.objects.filter(title=title).first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author_id=author_id, text='Комментарий')
+            for author_id in authors
+        )
+        return title, review
+
+    def _model_page(self, serializer_class, queryset, page_size):
+        return serializer_class(queryset[:page_size], many=True).data
+
+    def _values_page(self, serializer_class, queryset, page_size):
+        serializer = serializer_class()
+        return serializer.to_representation(
+            serializer.get_values(queryset)[:page_size]
+        )
+
+    def _run(self, function, serializer_class, queryset, page_size, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            function(serializer_class, queryset, page_size)
+        return time.perf_counter() - started
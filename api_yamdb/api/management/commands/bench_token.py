@@ -0,0 +1,95 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import (CaptureQueriesContext, setup_test_environment,
+                               teardown_test_environment)
+from django.urls import reverse
+
+from ...tokens import confirmation_code_generator
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Замеряет пропускную способность выдачи токена /auth/token/.
+    Запросы идут через тестовый клиент в этом же процессе, тестовые
+    пользователи создаются в транзакции, которая затем откатывается.
+    """
+    help = 'benchmark token issue endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Количество запросов на выдачу токена',
+        )
+        parser.add_argument(
+            '--with-password',
+            action='store_true',
+            help='Задать тестовым пользователям пароль, как у админов',
+        )
+
+    def handle(self, *args, **options):
+        # разрешает тестовому клиенту хост testserver
+        setup_test_environment()
+        try:
+            self._bench(options)
+        finally:
+            teardown_test_environment()
+
+    def _bench(self, options):
+        with transaction.atomic():
+            users = self._create_users(
+                options['requests'], options['with_password']
+            )
+            codes = [
+                confirmation_code_generator.make_token(user) for user in users
+            ]
+            elapsed, queries = self._run(users, codes)
+            transaction.set_rollback(True)
+        count = len(users)
+        self.stdout.write(
+            f'{count} token requests in {elapsed:.2f}s: '
+            f'{count / elapsed:.1f} req/s, '
+            f'{queries / count:.1f} queries per request'
+        )
+
+    def _create_users(self, count, with_password):
+        # хэш считаем один раз, он нужен только для того,
+        # чтобы у пользователей был настоящий пароль
+        password = make_password('bench-password') if with_password else None
+        User.objects.bulk_create(
+            User(
+                username=f'bench_token_{number}',
+                email=f'bench_token_{number}@yamdb.fake',
+                password=password or make_password(None),
+            )
+            for number in range(count)
+        )
+        return list(User.objects.filter(
+            username__startswith='bench_token_'
+        ).order_by('pk'))
+
+    def _run(self, users, codes):
+        client = Client()
+        url = reverse('api:token_obtain_pair')
+        elapsed = 0.0
+        with CaptureQueriesContext(connection) as context:
+            for user, code in zip(users, codes):
+                started = time.perf_counter()
+                response = client.post(url, {
+                    'username': user.username, 'confirmation_code': code,
+                })
+                elapsed += time.perf_counter() - started
+                if response.status_code != 200:
+                    raise RuntimeError(
+                        f'Token request failed: {response.status_code} '
+                        f'{response.content!r}'
+                    )
+        return elapsed, len(context.captured_queries)
@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Sum
+from reviews.models import Category, Genre, Review, Title
+
+from ...filters import TitleFilter
+from ...views import TitleViewSet
+
+
+class Command(BaseCommand):
+    """
+    Показывает планы запросов (EXPLAIN ANALYZE в PostgreSQL)
+    для основных сочетаний фильтров TitleFilter,
+    чтобы проверить, что они используют индексы.
+    """
+    help = 'explain title filter queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=10,
+            help='Размер страницы, как в API',
+        )
+        parser.add_argument(
+            '--disable-seqscan',
+            action='store_true',
+            help='Запретить seq scan (PostgreSQL), чтобы увидеть '
+                 'использование индексов на маленьких таблицах',
+        )
+
+    def handle(self, *args, **options):
+        sample = self._get_sample()
+        if sample is None:
+            self.stdout.write(self.style.WARNING('No titles to explain'))
+            return
+        combinations = (
+            ('category', 'year'),
+            ('genre',),
+            ('genre', 'year'),
+            ('category', 'genre'),
+            ('name',),
+            ('search',),
+        )
+        page_size = options['page_size']
+        if options['disable_seqscan'] and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+        for fields in combinations:
+            data = {field: sample[field] for field in fields}
+            queryset = TitleFilter(
+                data, queryset=TitleViewSet.queryset.order_by('pk')
+            ).qs
+            self._explain(f'titles {data}', queryset[:page_size])
+
+        reviews = Review.objects.filter(
+            title_id=sample['title_id']
+        ).order_by().values('title').annotate(
+            total=Sum('score'), count=Count('id')
+        )
+        self._explain(f'rating of title {sample["title_id"]}', reviews)
+
+    def _get_sample(self):
+        """Значения фильтров берутся из существующих данных."""
+        title = Title.objects.exclude(category=None).order_by('pk').first()
+        if title is None:
+            return None
+        genre = Genre.objects.filter(titles=title).first() or Genre()
+        return {
+            'title_id': title.pk,
+            'category': Category.objects.get(pk=title.category_id).slug,
+            'genre': genre.slug,
+            'year': title.year,
+            'name': title.name[:3],
+            'search': title.name,
+        }
+
+    def _explain(self, label, queryset):
+        options = {}
+        if connection.vendor == 'postgresql':
+            options = {'analyze': True, 'buffers': True}
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        self.stdout.write(queryset.explain(**options))
+        self.stdout.write('')
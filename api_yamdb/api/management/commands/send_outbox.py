@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...outbox import DispatchStats, send_pending
+
+
+class Command(BaseCommand):
+    """
+    Отправляет письма из очереди пачками.
+    С --loop работает постоянно, опрашивая очередь.
+    """
+    help = 'send queued emails'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Количество писем в одной пачке',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новые письма',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между опросами пустой очереди, в секундах',
+        )
+
+    def handle(self, *args, **options):
+        total = DispatchStats()
+        try:
+            while True:
+                stats = send_pending(options['batch_size'])
+                if stats.sent or stats.failed:
+                    total.update(stats)
+                    self.stdout.write(str(stats))
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Total: {total}')
@@ -0,0 +1,42 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+QUERY_COUNT_HEADER = 'X-DB-Query-Count'
+
+
+class QueryCounter():
+    """execute_wrapper, который считает запросы к БД."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryCountMiddleware():
+    """
+    Добавляет в ответ заголовок X-DB-Query-Count с количеством
+    запросов к БД за время обработки запроса, чтобы проверять,
+    что страница стоит O(1) запросов. Запросы при отдаче тела
+    StreamingHttpResponse не учитываются.
+    Включается настройкой API_QUERY_COUNT_HEADER.
+    """
+
+    def __init__(self, get_response):
+        if not settings.API_QUERY_COUNT_HEADER:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        response[QUERY_COUNT_HEADER] = str(counter.count)
+        return response
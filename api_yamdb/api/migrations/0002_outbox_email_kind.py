@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0001_outbox_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='kind',
+            field=models.CharField(blank=True, choices=[('confirmation_code', 'confirmation code')], max_length=20, verbose_name='Вид письма'),
+        ),
+        migrations.AddField(
+            model_name='outboxemail',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='body',
+            field=models.TextField(blank=True, verbose_name='Текст'),
+        ),
+    ]
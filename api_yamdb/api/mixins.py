@@ -0,0 +1,174 @@
+import time
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .cache import (get_cache, get_versions, last_modified, make_etag,
+                    make_response_key)
+
+
+class VersionedListMixin():
+    """
+    Ответы list снабжаются ETag и Last-Modified, вычисленными
+    по номерам поколений ресурсов из cache_resources.
+    На совпадающий условный запрос отдается 304 до работы сериализатора.
+    При cache_responses = True сами ответы тоже кэшируются:
+    после любой записи в ресурс старые ответы больше не выдаются.
+    """
+    cache_resources = ()
+    cache_responses = False
+
+    def list(self, request, *args, **kwargs):
+        return self.versioned_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def get_cache_resources(self):
+        return self.cache_resources
+
+    def versioned_response(self, handler, request, *args, **kwargs):
+        versions, modified = get_versions(*self.get_cache_resources())
+        key = make_response_key(request, versions)
+        etag = make_etag(key, request.accepted_renderer.format)
+        modified = last_modified(modified)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=modified
+        )
+        if response is None:
+            response = self.cached_response(
+                key, handler, request, *args, **kwargs
+            )
+        if response.status_code in (status.HTTP_200_OK,
+                                    status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            # изменение в текущей секунде еще возможно, а точность
+            # Last-Modified - секунда: такую метку не отдаем
+            if modified < int(time.time()):
+                response['Last-Modified'] = http_date(modified)
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def cached_response(self, key, handler, request, *args, **kwargs):
+        if not self.cache_responses:
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+
+class VersionedListRetrieveMixin(VersionedListMixin):
+    """То же для list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.versioned_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ValuesListMixin():
+    """
+    list без ModelSerializer: страница читается через .values()
+    и сериализуется values_serializer_class (см. fast_serializers).
+    Отключается настройкой API_VALUES_LIST = False.
+    """
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if (
+            self.values_serializer_class is None
+            or not settings.API_VALUES_LIST
+        ):
+            return super().list(request, *args, **kwargs)
+        serializer = self.values_serializer_class(
+            context=self.get_serializer_context()
+        )
+        queryset = serializer.get_values(
+            self.filter_queryset(self.get_queryset()),
+            # колонки, нужные пагинации и сортировке
+            getattr(self, 'always_loaded_fields', ()),
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer.to_representation(page)
+            )
+        return Response(serializer.to_representation(queryset))
+
+
+class FieldSelectionMixin():
+    """
+    Выбор полей ответа параметрами ?fields=a,b и ?omit=c для list
+    и retrieve. Лишние поля убираются из сериализатора, а из запроса
+    к БД - колонки (.only()), select_related и prefetch_related,
+    которые нужны только для них.
+
+    selectable_fields: поле ответа -> поля модели для .only();
+    select_related_fields / prefetch_related_fields: поле ответа ->
+    связь, которая загружается только при выборе этого поля;
+    always_loaded_fields: поля модели, нужные всегда, например
+    для сортировки в пагинации.
+    """
+    selectable_fields = {}
+    select_related_fields = {}
+    prefetch_related_fields = {}
+    always_loaded_fields = ('id',)
+
+    def get_selected_fields(self):
+        """Выбранные поля ответа, None - если выбраны все."""
+        if self.action not in ('list', 'retrieve'):
+            return None
+        params = self.request.query_params
+        if 'fields' not in params and 'omit' not in params:
+            return None
+        requested = self._parse_fields('fields') or set(
+            self.selectable_fields
+        )
+        return requested - self._parse_fields('omit')
+
+    def _parse_fields(self, param):
+        value = self.request.query_params.get(param, '')
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = names - set(self.selectable_fields)
+        if unknown:
+            raise ValidationError({
+                param: f'Неизвестные поля: {", ".join(sorted(unknown))}'
+            })
+        return names
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['selected_fields'] = self.get_selected_fields()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        selected = self.get_selected_fields()
+        if selected is None:
+            return queryset
+        only = set(self.always_loaded_fields)
+        for name in selected:
+            only.update(self.selectable_fields[name])
+        select_related = [
+            self.select_related_fields[name]
+            for name in sorted(selected) if name in self.select_related_fields
+        ]
+        prefetch_related = [
+            self.prefetch_related_fields[name]
+            for name in sorted(selected)
+            if name in self.prefetch_related_fields
+        ]
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset.only(*only)
@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+PENDING_STATUS = 'pending'
+SENT_STATUS = 'sent'
+FAILED_STATUS = 'failed'
+
+OUTBOX_STATUSES = [
+    (PENDING_STATUS, 'pending'),
+    (SENT_STATUS, 'sent'),
+    (FAILED_STATUS, 'failed'),
+]
+
+# письмо с кодом подтверждения: текст с кодом составляется при отправке
+CONFIRMATION_CODE_KIND = 'confirmation_code'
+
+OUTBOX_KINDS = [
+    (CONFIRMATION_CODE_KIND, 'confirmation code'),
+]
+
+
+class OutboxEmail(models.Model):
+    """
+    Письмо в очереди на отправку.
+    Запрос только создает запись, отправляет их команда send_outbox.
+    """
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(blank=True, verbose_name='Текст')
+    kind = models.CharField(
+        max_length=20,
+        choices=OUTBOX_KINDS,
+        blank=True,
+        verbose_name='Вид письма',
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name='Пользователь',
+    )
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    to_email = models.EmailField(verbose_name='Получатель')
+    status = models.CharField(
+        max_length=10,
+        choices=OUTBOX_STATUSES,
+        default=PENDING_STATUS,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            # выборка писем, которые пора отправлять
+            models.Index(fields=['status', 'next_attempt_at'])
+        ]
+
+    def __str__(self):
+        return f'{self.to_email}: {self.subject}'
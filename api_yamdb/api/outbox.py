@@ -0,0 +1,204 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+
+from api_yamdb.utils import iter_chunks
+
+from .models import (CONFIRMATION_CODE_KIND, FAILED_STATUS, PENDING_STATUS,
+                     SENT_STATUS, OutboxEmail)
+from .tokens import confirmation_code_generator
+
+CONFIRMATION_CODE_SUBJECT = 'Ваш ключ подтверждения'
+CONFIRMATION_CODE_TEXT = 'Для вас был сгенерирован ключ подтверждения {code}'
+
+
+def enqueue_email(subject, body, to_email, from_email=None):
+    """
+    Ставит письмо в очередь. Вызывается внутри транзакции запроса:
+    письмо уйдет, только если транзакция завершится успешно.
+    """
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.FROM_EMAIL,
+        to_email=to_email,
+    )
+
+
+def enqueue_confirmation_code(user):
+    """
+    Ставит в очередь письмо с кодом подтверждения. В очереди хранится
+    только пользователь: код вычисляется при отправке и нигде
+    не сохраняется. Если такое письмо еще ждет отправки, новое
+    не создается: код в нем и так будет свежим.
+    """
+    pending = OutboxEmail.objects.filter(
+        user=user,
+        kind=CONFIRMATION_CODE_KIND,
+        to_email=user.email,
+        status=PENDING_STATUS,
+    ).first()
+    if pending is not None:
+        return pending
+    return OutboxEmail.objects.create(
+        subject=CONFIRMATION_CODE_SUBJECT,
+        kind=CONFIRMATION_CODE_KIND,
+        user=user,
+        from_email=settings.FROM_EMAIL,
+        to_email=user.email,
+    )
+
+
+def render_body(email):
+    """Текст письма; для писем с кодом код вычисляется здесь."""
+    if email.kind == CONFIRMATION_CODE_KIND:
+        return CONFIRMATION_CODE_TEXT.format(
+            code=confirmation_code_generator.make_token(email.user)
+        )
+    return email.body
+
+
+def get_retry_delay(attempts):
+    """Экспоненциальная задержка перед повторной попыткой."""
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_DELAY))
+
+
+def register_failure(email, error):
+    """Запоминает ошибку и назначает повторную попытку."""
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = FAILED_STATUS
+    else:
+        email.next_attempt_at = (
+            timezone.now() + get_retry_delay(email.attempts)
+        )
+
+
+class DispatchStats:
+    """Счетчики отправки писем: сколько отправлено и как быстро."""
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.batches = 0
+        self.connections = 0
+        self.elapsed = 0.0
+
+    @property
+    def rate(self):
+        """Отправленных писем в секунду."""
+        if not self.elapsed:
+            return 0.0
+        return self.sent / self.elapsed
+
+    def update(self, other):
+        self.sent += other.sent
+        self.failed += other.failed
+        self.batches += other.batches
+        self.connections += other.connections
+        self.elapsed += other.elapsed
+
+    def __str__(self):
+        return (
+            f'Sent {self.sent} emails, {self.failed} failed, '
+            f'{self.batches} batches over {self.connections} connections, '
+            f'{self.rate:.1f} emails/s'
+        )
+
+
+def claim_pending(batch_size):
+    """
+    Забирает письма, которые пора отправлять, в короткой транзакции:
+    увеличивает счетчик попыток и откладывает следующую попытку
+    на EMAIL_OUTBOX_CLAIM_TIMEOUT, чтобы их не взял другой обработчик.
+    Если обработчик упадет, письма вернутся в очередь после этого срока.
+    """
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+                status=PENDING_STATUS,
+                next_attempt_at__lte=timezone.now(),
+            ).order_by('next_attempt_at')[:batch_size]
+        )
+        claimed_until = timezone.now() + timedelta(
+            seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+        )
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = claimed_until
+        OutboxEmail.objects.bulk_update(
+            emails, ['attempts', 'next_attempt_at']
+        )
+    return emails
+
+
+def save_results(emails):
+    OutboxEmail.objects.bulk_update(
+        emails, ['status', 'next_attempt_at', 'sent_at', 'last_error']
+    )
+
+
+def send_batch(emails, connection, stats):
+    """
+    Отправляет пачку писем через открытое соединение. Письма уходят
+    по одному, чтобы при ошибке на середине пачки повторно
+    отправлялись только неотправленные письма.
+    """
+    stats.batches += 1
+    for email in emails:
+        message = EmailMessage(
+            email.subject, render_body(email), email.from_email,
+            [email.to_email], connection=connection,
+        )
+        try:
+            sent = connection.send_messages([message])
+        except Exception as error:
+            register_failure(email, error)
+            continue
+        if not sent:
+            register_failure(email, 'Письмо не отправлено')
+            continue
+        email.status = SENT_STATUS
+        email.sent_at = timezone.now()
+
+
+def send_pending(batch_size):
+    """
+    Отправляет письма, которые пора отправлять, через одно соединение
+    с почтовым сервером пачками по EMAIL_SEND_BATCH_SIZE. Письма
+    забираются заранее, поэтому несколько обработчиков не отправят
+    одно письмо дважды, а транзакция не держится во время отправки.
+    Результат записывается после каждой пачки.
+    Возвращает DispatchStats.
+    """
+    stats = DispatchStats()
+    started = time.monotonic()
+    emails = claim_pending(batch_size)
+    if not emails:
+        return stats
+    # пользователи для писем с кодом, одним запросом
+    prefetch_related_objects(emails, 'user')
+    done = 0
+    try:
+        with get_connection() as connection:
+            stats.connections += 1
+            for chunk in iter_chunks(emails, settings.EMAIL_SEND_BATCH_SIZE):
+                send_batch(chunk, connection, stats)
+                save_results(chunk)
+                done += len(chunk)
+    except Exception as error:
+        # не удалось соединиться с почтовым сервером
+        rest = emails[done:]
+        for email in rest:
+            register_failure(email, error)
+        save_results(rest)
+    stats.sent = sum(email.status == SENT_STATUS for email in emails)
+    stats.failed = len(emails) - stats.sent
+    stats.elapsed = time.monotonic() - started
+    return stats
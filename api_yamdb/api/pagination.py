@@ -0,0 +1,144 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (CursorPagination, LimitOffsetPagination,
+                                       _reverse_ordering)
+
+# разделитель даты и id в позиции курсора
+POSITION_SEPARATOR = '|'
+
+
+class FeedCursorPagination(CursorPagination):
+    """
+    Курсорная (keyset) пагинация лент отзывов и комментариев по паре
+    (pub_date, id). Не делает COUNT(*) и OFFSET, поэтому глубокие
+    страницы отдаются так же быстро, как первая.
+
+    CursorPagination DRF ставит курсор только по первому полю
+    сортировки, а записи с той же датой пропускает смещением: при многих
+    одинаковых датах ссылка previous теряет записи. Здесь позиция
+    курсора - дата и id записи на границе страницы, и лента фильтруется
+    по паре целиком.
+    """
+    ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # повторяет CursorPagination.paginate_queryset,
+        # кроме фильтра по позиции курсора
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(current_position, reverse)
+            )
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        self.set_links(offset, reverse, current_position, following_position)
+        if reverse:
+            self.page = list(reversed(self.page))
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def set_links(self, offset, reverse, current_position,
+                  following_position):
+        """Есть ли страницы до и после текущей и их позиции."""
+        has_current = current_position is not None or offset > 0
+        has_following = following_position is not None
+        if reverse:
+            self.has_next, self.has_previous = has_current, has_following
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next, self.has_previous = has_following, has_current
+            self.next_position = following_position
+            self.previous_position = current_position
+
+    def get_position_filter(self, position, reverse):
+        """
+        Записи после позиции в ленте (reverse - перед ней). Условие
+        pub_date <= ... отдельно, чтобы БД читала индекс диапазоном.
+        """
+        pub_date, pk = self.parse_position(position)
+        if reverse:
+            return Q(pub_date__gte=pub_date) & (
+                Q(pub_date__gt=pub_date) | Q(id__gt=pk)
+            )
+        return Q(pub_date__lte=pub_date) & (
+            Q(pub_date__lt=pub_date) | Q(id__lt=pk)
+        )
+
+    def parse_position(self, position):
+        pub_date, _, pk = position.partition(POSITION_SEPARATOR)
+        try:
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except ValueError:
+            pub_date = None
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, pk
+
+    def _get_position_from_instance(self, instance, ordering):
+        # списки из .values() приходят словарями
+        if isinstance(instance, dict):
+            pub_date, pk = instance['pub_date'], instance['id']
+        else:
+            pub_date, pk = instance.pub_date, instance.pk
+        return f'{pub_date.isoformat()}{POSITION_SEPARATOR}{pk}'
+
+
+class FeedPagination(LimitOffsetPagination):
+    """
+    По умолчанию - обычная пагинация limit / offset.
+    Курсорный режим включается параметром ?pagination=cursor,
+    дальше клиент ходит по ссылкам next / previous с ?cursor=.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+
+    cursor_paginator = None
+
+    def is_cursor_mode(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or FeedCursorPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_mode(request):
+            self.cursor_paginator = FeedCursorPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
@@ -33,7 +33,7 @@ class IsAuthorOrAdminOrModeratorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        if obj.author == request.user:
+        if obj.author_id == request.user.pk:
             return True
         # а админам и модераторам разрешено
         if request.user.is_admin or request.user.is_moderator:
@@ -0,0 +1,129 @@
+import codecs
+import io
+import re
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# даты и время orjson отдает в default, чтобы они кодировались
+# так же, как в JSONEncoder DRF (миллисекунды, 'Z' вместо +00:00)
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if orjson is not None else 0
+)
+LINE_SEPARATOR = '\u2028'.encode('utf-8')
+PARAGRAPH_SEPARATOR = '\u2029'.encode('utf-8')
+# целые больше 64 бит orjson читает как float, поэтому тела
+# с длинными рядами цифр разбирает стандартный json
+LONG_NUMBER_RE = re.compile(rb'\d{19}')
+# типы, которые has_special_floats пропускает без проверки
+PLAIN_TYPES = frozenset((str, int, bool, type(None)))
+
+
+def has_special_floats(data):
+    """
+    Есть ли в данных числа, которые orjson записывает иначе, чем json:
+    NaN и бесконечности (orjson пишет null, json с allow_nan=False
+    выдает ошибку) и числа, которые json пишет с порядком (1e-07,
+    1e+16). Decimal проверяется как float, в который его превратит
+    JSONEncoder. Ключи словарей не проверяются: в ответах API они
+    строки или целые числа.
+    """
+    stack = [(data,)]
+    while stack:
+        container = stack.pop()
+        if isinstance(container, dict):
+            container = container.values()
+        for value in container:
+            kind = type(value)
+            if kind in PLAIN_TYPES:
+                continue
+            if kind is float or kind is Decimal:
+                number = float(value)
+                if number and not 1e-4 <= abs(number) < 1e16:
+                    return True
+            elif isinstance(value, (dict, list, tuple)):
+                stack.append(value)
+    return False
+
+
+def json_dumps(data, encoder_class=JSONEncoder):
+    """
+    Компактный JSON в UTF-8, как у JSONRenderer с настройками
+    по умолчанию. Быстрый путь - orjson, если он установлен и в данных
+    нет чисел, которые он записывает иначе (см. has_special_floats).
+    """
+    if orjson is not None and not has_special_floats(data):
+        try:
+            return orjson.dumps(
+                data, default=encoder_class().default, option=ORJSON_OPTIONS
+            )
+        except TypeError:
+            # числа больше 64 бит и неизвестные типы: стандартный json
+            # вернет то же значение, что и раньше, или ту же ошибку
+            pass
+    return encoder_class(
+        ensure_ascii=False, allow_nan=False, separators=(',', ':')
+    ).encode(data).encode('utf-8')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson. Ответ совпадает с ответом стандартного
+    рендерера для типов, которые встречаются в ответах API (строки,
+    целые, float, даты, Decimal, словари и списки со строковыми
+    и целыми ключами); с отступами (?indent= в Accept) и при
+    нестандартных настройках UNICODE_JSON, COMPACT_JSON, STRICT_JSON
+    используется стандартный json.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # как и JSONRenderer, экранируем разделители строк,
+        # недопустимые в строках JavaScript
+        return json_dumps(data, self.encoder_class).replace(
+            LINE_SEPARATOR, b'\\u2028'
+        ).replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser на orjson. Тело, которое orjson не принял, разбирает
+    стандартный парсер: он вернет те же данные или ту же ошибку.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if (
+            orjson is None
+            or not self.strict
+            or codecs.lookup(encoding).name != 'utf-8'
+        ):
+            return super().parse(stream, media_type, parser_context)
+        content = stream.read()
+        if not LONG_NUMBER_RE.search(content):
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(content), media_type, parser_context)
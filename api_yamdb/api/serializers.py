@@ -1,10 +1,13 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleRanking)
+
+from .tokens import confirmation_code_generator, get_refresh_token
 
 User = get_user_model()
 
@@ -25,33 +28,34 @@ class SerializerUtilityMethods():
         return username
 
 
-class TokenWithoutPasswordSerializer(TokenObtainPairSerializer):
+class TokenWithoutPasswordSerializer(serializers.Serializer):
     """
     Сериализатор нужен, чтобы выдавать пользователю токен
-    по паре логин / confirmation_code
+    по паре логин / confirmation_code.
+    Пользователь ищется одним запросом по username, пароль
+    не проверяется, поэтому authenticate() здесь не нужен.
     """
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['confirmation_code'] = serializers.CharField()
-        self.fields['password'].required = False
+    username = serializers.CharField()
+    confirmation_code = serializers.CharField(
+        error_messages={'blank': 'Введите код подтверждения'}
+    )
 
     def validate(self, attrs):
-        # заполнение пробелом нужно, чтобы не было ошибки, т.к. проверяется,
-        # что поле пароль хоть чем-то заполнено
-        attrs.update({'password': ''})
-        if attrs['confirmation_code'] == '':
-            raise serializers.ValidationError('Введите код подтверждения')
-        auth_user = get_object_or_404(
-            User,
-            username=self.initial_data['username']
-        )
-        if not auth_user:
-            raise serializers.ValidationError('Введены неверные данные')
-        # проверяем, правильный ли указан confirmation_code
-        if auth_user.confirmation_code != attrs['confirmation_code']:
+        auth_user = get_object_or_404(User, username=attrs['username'])
+        # код не хранится в БД, а вычисляется по данным пользователя
+        if not auth_user.is_active or not (
+            confirmation_code_generator.check_token(
+                auth_user, attrs['confirmation_code']
+            )
+        ):
             raise serializers.ValidationError('Введены неверные данные')
-        return super().validate(attrs)
+        # после входа код становится недействительным
+        update_last_login(None, auth_user)
+        refresh = get_refresh_token(auth_user)
+        return {
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+        }
 
 
 class UserRegisterSerializer(serializers.ModelSerializer):
@@ -104,6 +108,20 @@ class OwnProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ('username', 'email', 'role', )
 
 
+class SelectedFieldsMixin():
+    """
+    Оставляет в сериализаторе только поля из
+    context['selected_fields'], см. FieldSelectionMixin.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.context.get('selected_fields')
+        if selected is not None:
+            for name in set(self.fields) - set(selected):
+                self.fields.pop(name)
+
+
 class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор для категории"""
 
@@ -120,7 +138,7 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ("name", "slug",)
 
 
-class TitleBaseSerializer(serializers.ModelSerializer):
+class TitleBaseSerializer(SelectedFieldsMixin, serializers.ModelSerializer):
     """Сериализатор произведений для чтения."""
 
     genre = GenreSerializer(read_only=True, many=True)
@@ -135,6 +153,16 @@ class TitleBaseSerializer(serializers.ModelSerializer):
         read_only_fields = ['rating']
 
 
+class TitleRankingSerializer(serializers.ModelSerializer):
+    """Сериализатор места произведения в рейтинге."""
+
+    title = TitleBaseSerializer(read_only=True)
+
+    class Meta:
+        model = TitleRanking
+        fields = ('position', 'score', 'review_count', 'title')
+
+
 class TitlePostSerializer(serializers.ModelSerializer):
     """Сериализатор произведений для записи."""
 
@@ -158,7 +186,18 @@ class TitlePostSerializer(serializers.ModelSerializer):
         return value
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleBulkSerializer(TitlePostSerializer):
+    """
+    Проверка произведения для массовой записи. Слаги жанров и
+    категории здесь не ищутся в БД: их проверяют одним запросом
+    на всю пачку.
+    """
+
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+
+class ReviewSerializer(SelectedFieldsMixin, serializers.ModelSerializer):
     """Сериализатор отзывов."""
 
     author = serializers.SlugRelatedField(
@@ -172,7 +211,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         required_fields = ('title', 'text', 'score')
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SelectedFieldsMixin, serializers.ModelSerializer):
     """Сериализатор комментариев."""
 
     author = serializers.SlugRelatedField(
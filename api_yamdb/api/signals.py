@@ -0,0 +1,98 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleRanking, User)
+from reviews.signals import models_bulk_changed
+
+from .authentication import forget_role_version, set_role_version, user_cache
+from .cache import bump_version
+
+# какой ресурс API устаревает при изменении модели
+MODEL_RESOURCES = {
+    Category: 'categories',
+    Genre: 'genres',
+    Title: 'titles',
+    Title.genre.through: 'titles',
+    Review: 'reviews',
+    Comment: 'comments',
+    User: 'users',
+    TitleRanking: 'rankings',
+}
+
+
+# какие ресурсы устаревают при удалении объекта модели: связанные
+# строки удаляются каскадом (или получают NULL) без сигналов.
+# У Comment, связи жанров и TitleRanking нет обработчика post_delete,
+# иначе Collector не удаляет их одним запросом, а загружает построчно
+DELETE_RESOURCES = {
+    Category: ('categories', 'titles', 'rankings'),
+    Genre: ('genres', 'titles', 'rankings'),
+    Title: ('titles', 'reviews', 'comments', 'rankings'),
+    Review: ('reviews', 'comments'),
+    User: ('users', 'reviews', 'comments'),
+}
+
+
+def bump_on_commit(*resources):
+    # увеличиваем поколение после коммита, чтобы параллельный
+    # запрос не закэшировал старые данные под новой версией
+    transaction.on_commit(lambda: bump_version(*resources))
+
+
+def bump_resource_version(sender, update_fields=None, **kwargs):
+    # время входа пользователя в ответы API не попадает
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_on_commit(MODEL_RESOURCES[sender])
+
+
+def bump_deleted_resources(sender, **kwargs):
+    bump_on_commit(*DELETE_RESOURCES[sender])
+
+
+# обработчики подключаются к конкретным моделям: глобальный
+# обработчик post_delete отключил бы быстрое удаление у всех моделей
+for model in MODEL_RESOURCES:
+    post_save.connect(bump_resource_version, sender=model)
+    models_bulk_changed.connect(bump_resource_version, sender=model)
+for model in DELETE_RESOURCES:
+    post_delete.connect(bump_deleted_resources, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_genres_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_on_commit(MODEL_RESOURCES[sender])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user_snapshot(sender, instance, update_fields=None, **kwargs):
+    # время входа в снимок пользователя не входит,
+    # снимка нового пользователя еще нет ни в одном процессе
+    if kwargs.get('created') or (
+        update_fields is not None and set(update_fields) <= {'last_login'}
+    ):
+        return
+    transaction.on_commit(lambda: user_cache.delete(instance.pk))
+
+
+@receiver(post_save, sender=User)
+def remember_role_version(sender, instance, created, **kwargs):
+    if created or 'role_version' in instance.get_deferred_fields():
+        return
+    transaction.on_commit(
+        lambda: set_role_version(instance.pk, instance.role_version)
+    )
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_role_version(sender, instance, **kwargs):
+    transaction.on_commit(lambda: forget_role_version(instance.pk))
+
+
+@receiver(models_bulk_changed, sender=User)
+def forget_user_snapshots(sender, **kwargs):
+    # в общем кэше снимки доживут до AUTH_USER_SHARED_CACHE_TIMEOUT
+    transaction.on_commit(user_cache.clear)
@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# права пользователя, которые попадают в токен при JWT_ROLE_CLAIMS
+ROLE_CLAIMS = ('role', 'is_staff', 'is_superuser')
+ROLE_VERSION_CLAIM = 'role_version'
+
+
+class ConfirmationCodeGenerator:
+    """
+    Генерирует и проверяет коды подтверждения по образцу
+    django.contrib.auth.tokens.PasswordResetTokenGenerator.
+
+    Код - это HMAC от id, email и last_login пользователя и времени
+    выдачи, поэтому хранить его в БД не нужно. После получения токена
+    last_login меняется, и выданные ранее коды перестают подходить.
+    """
+    key_salt = 'api.tokens.ConfirmationCodeGenerator'
+
+    def make_token(self, user):
+        return self._make_token_with_timestamp(user, self._now())
+
+    def check_token(self, user, token):
+        """Проверяет, что код выдан этому пользователю и не истек."""
+        if not (user and token):
+            return False
+        try:
+            ts_b36, _ = token.split('-')
+            timestamp = base36_to_int(ts_b36)
+        except ValueError:
+            return False
+        if not constant_time_compare(
+            self._make_token_with_timestamp(user, timestamp), token
+        ):
+            return False
+        return self._now() - timestamp <= settings.CONFIRMATION_CODE_TIMEOUT
+
+    def _make_token_with_timestamp(self, user, timestamp):
+        hash_string = salted_hmac(
+            self.key_salt,
+            self._make_hash_value(user, timestamp),
+            secret=settings.SECRET_KEY,
+        ).hexdigest()[::2]
+        return f'{int_to_base36(timestamp)}-{hash_string}'
+
+    def _make_hash_value(self, user, timestamp):
+        # PostgreSQL и SQLite хранят last_login с микросекундами,
+        # поэтому код перестает подходить даже после входа в ту же секунду
+        login_timestamp = '' if user.last_login is None else (
+            user.last_login.timestamp()
+        )
+        return f'{user.pk}{user.email}{login_timestamp}{timestamp}'
+
+    def _now(self):
+        return int(time.time())
+
+
+confirmation_code_generator = ConfirmationCodeGenerator()
+
+
+def get_refresh_token(user):
+    """
+    Выдает refresh-токен пользователя. При JWT_ROLE_CLAIMS в него
+    и в access-токен записываются роль и версия прав, и для проверки
+    прав пользователя не нужно загружать из БД.
+    """
+    token = RefreshToken.for_user(user)
+    if settings.JWT_ROLE_CLAIMS:
+        for claim in ROLE_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[ROLE_VERSION_CLAIM] = user.role_version
+    return token
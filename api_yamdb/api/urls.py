@@ -1,9 +1,11 @@
 from django.urls import include, path
 from rest_framework import routers
+from reviews.rankings import BOARD_WINDOWS
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    MyProfileViewSet, RegistrationViewSet, ReviewViewSet,
-                    TitleViewSet, TokenObtainPairWithoutPassword, UserViewSet)
+                    LeaderboardViewSet, MyProfileViewSet, RegistrationViewSet,
+                    ReviewViewSet, TitleViewSet,
+                    TokenObtainPairWithoutPassword, UserViewSet)
 
 app_name = 'api'
 router = routers.DefaultRouter()
@@ -12,6 +14,10 @@ router.register('users', UserViewSet)
 router.register('categories', CategoryViewSet, basename='categories')
 router.register('genres', GenreViewSet, basename='genres')
 router.register('titles', TitleViewSet, basename='titles')
+router.register(
+    r'leaderboards/(?P<board>{})'.format('|'.join(BOARD_WINDOWS)),
+    LeaderboardViewSet, basename='leaderboards'
+)
 router.register(r'titles/(?P<title_id>\d+)/reviews',
                 ReviewViewSet, basename='reviews')
 router.register(
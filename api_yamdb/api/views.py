@@ -1,27 +1,41 @@
-import uuid
-
 from django.contrib.auth import get_user_model
-from django.core.mail import EmailMessage
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework_simplejwt.views import TokenViewBase
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleRanking)
+from reviews.ratings import apply_rating_delta, get_score_stats
 
-from api_yamdb.settings import FROM_EMAIL
+from api_yamdb.utils import is_constraint_violation, iter_chunks
 
+from .bulk import SlugBulkMixin, TitleBulkMixin
+from .fast_serializers import (CommentValuesSerializer, ReviewValuesSerializer,
+                               TitleValuesSerializer)
 from .filters import TitleFilter
+from .mixins import (FieldSelectionMixin, ValuesListMixin, VersionedListMixin,
+                     VersionedListRetrieveMixin)
+from .outbox import enqueue_confirmation_code
+from .pagination import FeedPagination
 from .permissions import (IsAdminOrReadOnly, IsAdminOrSuperUser,
                           IsAuthorOrAdminOrModeratorOrReadOnly)
+from .renderers import json_dumps
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, OwnProfileSerializer,
                           ReviewSerializer, TitleBaseSerializer,
-                          TitlePostSerializer, TokenWithoutPasswordSerializer,
-                          UserMainSerializer, UserRegisterSerializer)
+                          TitlePostSerializer, TitleRankingSerializer,
+                          TokenWithoutPasswordSerializer, UserMainSerializer,
+                          UserRegisterSerializer)
+from .signals import bump_on_commit
 
 User = get_user_model()
 
@@ -29,24 +43,15 @@ User = get_user_model()
 class ViewsUtilityMethods():
     """Повторяющиеся / служебные методы"""
 
-    def generate_confirmation_code():
-        """генерирует случайный код подтверждения"""
-
-        # генерирует случайный ключ UUID
-        confirmation_code = uuid.uuid4()
-        return confirmation_code
+    def confirmation_code_send(user):
+        """
+        Ставит письмо с кодом подтверждения в очередь на отправку,
+        само письмо отправит команда send_outbox.
+        Код не сохраняется даже в очереди: send_outbox вычисляет его
+        по данным пользователя в момент отправки.
+        """
 
-    def confirmation_code_send(confirmation_code: str, to_email: str):
-        """Отправляет код подтверждения на почту"""
-
-        email = EmailMessage(
-            'Ваш ключ подтверждения',
-            (f'Для вас был сгенерирован ключ подтверждения'
-             f' {confirmation_code}'),
-            FROM_EMAIL,
-            [to_email]
-        )
-        email.send()
+        enqueue_confirmation_code(user)
 
 
 class UpdateRetrieveViewSet(mixins.UpdateModelMixin, mixins.RetrieveModelMixin,
@@ -72,10 +77,12 @@ class MyProfileViewSet(UpdateRetrieveViewSet):
     queryset = User.objects.all()
 
     def get_object(self):
-        return self.request.user
+        # в request.user загружены только поля для проверки прав,
+        # а профилю нужны все поля пользователя
+        return self.get_queryset().get(pk=self.request.user.pk)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(VersionedListRetrieveMixin, viewsets.ModelViewSet):
     """
     Viewset for User Model.
     Используется для url /users/
@@ -85,14 +92,15 @@ class UserViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminOrSuperUser]
     pagination_class = PageNumberPagination
     lookup_field = 'username'
+    cache_resources = ('users',)
 
     def perform_create(self, serializer, *args, **kwargs):
         """
-        Create new User.
+        Create new User. Код подтверждения уходит в общую очередь писем
+        и отправляется пачкой вместе с остальными.
         """
-        serializer.save(
-            confirmation_code=ViewsUtilityMethods.generate_confirmation_code()
-        )
+        with transaction.atomic():
+            ViewsUtilityMethods.confirmation_code_send(serializer.save())
 
 
 class RegistrationViewSet(CreateViewSet):
@@ -101,23 +109,18 @@ class RegistrationViewSet(CreateViewSet):
     queryset = User.objects.all()
     serializer_class = UserRegisterSerializer
     permission_classes = [AllowAny]
+    # без входа можно запрашивать коды, поэтому число запросов ограничено
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'signup'
 
     def perform_create(self, serializer, *args, **kwargs):
         """
-        Create new User. Здесь мы генерируем новый Confirmation Code,
-        записываем в юзера и высылаем его на почту.
+        Create new User. Здесь мы создаем пользователя
+        и высылаем ему на почту код подтверждения.
         """
-        # Генерируем confirmation_code
-        confirmation_code = ViewsUtilityMethods.generate_confirmation_code()
-        # Отправляем Confirmation code
-        ViewsUtilityMethods.confirmation_code_send(
-            confirmation_code,
-            serializer.validated_data['email']
-        )
-        # Сохраняем confirmation code
-        serializer.save(
-            confirmation_code=confirmation_code
-        )
+        # пользователь и письмо создаются в одной транзакции
+        with transaction.atomic():
+            ViewsUtilityMethods.confirmation_code_send(serializer.save())
 
     def create(self, request, *args, **kwargs):
         """
@@ -125,6 +128,18 @@ class RegistrationViewSet(CreateViewSet):
         чтобы выдавать 200 ошибку, а не 201, как это делает
         стандартный код при создании записи
         """
+        user = User.objects.filter(
+            username=request.data.get('username'),
+            email=request.data.get('email'),
+        ).first()
+        if user is not None:
+            # повторный запрос кода: пользователь уже есть,
+            # в таблицу пользователей ничего не пишем
+            ViewsUtilityMethods.confirmation_code_send(user)
+            return Response(
+                {'username': user.username, 'email': user.email},
+                status=status.HTTP_200_OK
+            )
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
@@ -149,7 +164,7 @@ class CreateListDeleteViewSet(mixins.CreateModelMixin,
     pass
 
 
-class GenreViewSet(CreateListDeleteViewSet):
+class GenreViewSet(SlugBulkMixin, VersionedListMixin, CreateListDeleteViewSet):
     """Viewset для работы с жанрами произведений."""
 
     queryset = Genre.objects.all()
@@ -158,9 +173,12 @@ class GenreViewSet(CreateListDeleteViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_resources = ('genres',)
+    cache_responses = True
 
 
-class CategoryViewSet(CreateListDeleteViewSet):
+class CategoryViewSet(SlugBulkMixin, VersionedListMixin,
+                      CreateListDeleteViewSet):
     """Viewset для работы с категориями произведений."""
 
     queryset = Category.objects.all()
@@ -169,59 +187,207 @@ class CategoryViewSet(CreateListDeleteViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_resources = ('categories',)
+    cache_responses = True
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(TitleBulkMixin, FieldSelectionMixin,
+                   VersionedListRetrieveMixin, ValuesListMixin,
+                   viewsets.ModelViewSet):
     """Viewset для работы с произведениями."""
 
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     serializer_class = TitlePostSerializer
+    values_serializer_class = TitleValuesSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = TitleFilter
     pagination_class = PageNumberPagination
     permission_classes = (IsAdminOrReadOnly,)
+    # рейтинг и вложенные жанры/категории тоже входят в ответ
+    cache_resources = ('titles', 'genres', 'categories', 'reviews')
+    cache_responses = True
+    selectable_fields = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating_sum', 'rating_count'),
+        'description': ('description',),
+        'genre': (),
+        'category': ('category', 'category__name', 'category__slug'),
+    }
+    select_related_fields = {'category': 'category'}
+    prefetch_related_fields = {'genre': 'genre'}
+
+    # сколько произведений читается из БД и сериализуется за раз
+    export_chunk_size = 500
 
     def get_serializer_class(self):
         if self.action in ('create', 'update', 'partial_update'):
             return TitlePostSerializer
         return TitleBaseSerializer
 
+    def get_cache_resources(self):
+        if self.action == 'stats':
+            # статистика зависит только от отзывов
+            return ('titles', 'reviews')
+        return super().get_cache_resources()
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """
+        Количество, среднее, медиана и гистограмма оценок 1-10.
+        Ответ кэшируется до следующего изменения отзывов.
+        """
+        return self.versioned_response(self._stats, request, pk=pk)
+
+    def _stats(self, request, pk=None):
+        try:
+            stats = get_score_stats(int(pk))
+        except ValueError:
+            stats = None
+        if stats is None:
+            raise NotFound()
+        return Response(stats)
+
+    @action(detail=False, permission_classes=[IsAdminOrSuperUser])
+    def export(self, request):
+        """
+        Выгрузка всех произведений (с учетом фильтров) в формате
+        NDJSON: одна строка - одно произведение.
+        """
+        queryset = self.filter_queryset(
+            Title.objects.select_related('category').order_by('pk')
+        )
+        return StreamingHttpResponse(
+            self._export_lines(queryset),
+            content_type='application/x-ndjson'
+        )
+
+    def _export_lines(self, queryset):
+        titles = queryset.iterator(chunk_size=self.export_chunk_size)
+        for chunk in iter_chunks(titles, self.export_chunk_size):
+            # iterator() не умеет prefetch_related - жанры
+            # подгружаем одним запросом на пачку
+            prefetch_related_objects(chunk, 'genre')
+            for item in TitleBaseSerializer(chunk, many=True).data:
+                yield json_dumps(item) + b'\n'
+
+
+class LeaderboardViewSet(VersionedListMixin, mixins.ListModelMixin,
+                         viewsets.GenericViewSet):
+    """
+    Рейтинги произведений: общий, по категории (?category=slug)
+    или по жанру (?genre=slug). Места заранее посчитаны
+    командой refresh_rankings, страница читается по индексу.
+    """
+
+    serializer_class = TitleRankingSerializer
+    permission_classes = (IsAdminOrReadOnly,)
+    pagination_class = PageNumberPagination
+    cache_resources = ('rankings', 'titles', 'genres', 'categories',
+                       'reviews')
+    cache_responses = True
+
+    def get_queryset(self):
+        queryset = TitleRanking.objects.filter(
+            board=self.kwargs['board']
+        ).select_related('title__category').prefetch_related(
+            'title__genre'
+        ).order_by('position')
+        category = self.request.query_params.get('category')
+        genre = self.request.query_params.get('genre')
+        if category and genre:
+            raise ValidationError(
+                'Укажите либо категорию, либо жанр'
+            )
+        if category:
+            return queryset.filter(category__slug=category, genre=None)
+        if genre:
+            return queryset.filter(genre__slug=genre, category=None)
+        return queryset.filter(category=None, genre=None)
+
+
+class ReviewViewSet(FieldSelectionMixin, VersionedListRetrieveMixin,
+                    ValuesListMixin, viewsets.ModelViewSet):
     """Viewset для работы с отзывами на произведения."""
 
     permission_classes = [IsAuthorOrAdminOrModeratorOrReadOnly]
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
+    pagination_class = FeedPagination
+    # в ответ входит username автора
+    cache_resources = ('reviews', 'users')
+    selectable_fields = {
+        'id': ('id',),
+        'author': ('author', 'author__username'),
+        'title': ('title',),
+        'text': ('text',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+    }
+    select_related_fields = {'author': 'author'}
+    # дата нужна курсорной пагинации
+    always_loaded_fields = ('id', 'pub_date')
 
     def get_queryset(self):
         title_id = self.kwargs.get('title_id')
-        return Review.objects.filter(title_id=title_id)
+        # из автора нужен только username
+        return Review.objects.filter(
+            title_id=title_id
+        ).select_related('author').only(
+            'id', 'title', 'text', 'score', 'pub_date',
+            'author', 'author__username',
+        )
 
     def perform_create(self, serializer):
-        serializer.save(
-            author=self.request.user,
-            title=get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        # request.user может быть пользователем из токена,
+        # поэтому автора указываем по id.
+        # Отзыв записывается одним INSERT без предварительных проверок:
+        # повторный отзыв отклоняет ограничение unique_author_title,
+        # а рейтинг произведения обновляется здесь же, в той же
+        # транзакции - по числу обновленных строк видно,
+        # есть ли произведение
+        review = Review(
+            author_id=self.request.user.pk,
+            title_id=int(self.kwargs['title_id']),
+            **serializer.validated_data
         )
+        review._rating_applied = True
+        with transaction.atomic():
+            review.save()
+            if not apply_rating_delta(review.title_id, review.score, 1):
+                # строки произведения нет - откатываем отзыв,
+                # пока отложенная проверка внешнего ключа не сработала
+                raise NotFound()
+        serializer.instance = review
+
+    def perform_update(self, serializer):
+        # прежние произведение и оценку берем из заблокированной строки:
+        # иначе параллельные PATCH одного отзыва вычтут из рейтинга
+        # одну и ту же старую оценку
+        with transaction.atomic():
+            loaded_rating = Review.objects.select_for_update().filter(
+                pk=serializer.instance.pk
+            ).values_list('title_id', 'score').first()
+            if loaded_rating is None:
+                raise NotFound()
+            serializer.instance._loaded_rating = loaded_rating
+            serializer.save()
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        # сначала проверяем, что этот автор еще
-        # не оставлял отзыв о данном произведении
-        # если такое было, то выдаем ошибку
-        author = self.request.user,
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        existing_review = Review.objects.filter(
-            author=author[0],
-            title=title.pk,
-        )
-        if existing_review:
+        try:
+            self.perform_create(serializer)
+        except IntegrityError as error:
+            if not is_constraint_violation(
+                error, Review, 'unique_author_title'
+            ):
+                raise
             return Response(data={'message': 'Вы уже оставили отзыв'},
                             status=status.HTTP_400_BAD_REQUEST)
-        # дальше все происходит только тогда, когда
-        # мы уже убедились, что автор другого отзыва на это
-        # произведение не оставлял
-        self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
         return Response(
             serializer.data,
@@ -230,22 +396,46 @@ class ReviewViewSet(viewsets.ModelViewSet):
         )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(FieldSelectionMixin, VersionedListRetrieveMixin,
+                     ValuesListMixin, viewsets.ModelViewSet):
     """Viewset для работы с комментариями к произведениям."""
 
     permission_classes = [IsAuthorOrAdminOrModeratorOrReadOnly]
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
+    pagination_class = FeedPagination
+    cache_resources = ('comments', 'users')
+    selectable_fields = {
+        'id': ('id',),
+        'author': ('author', 'author__username'),
+        'review': ('review',),
+        'text': ('text',),
+        'pub_date': ('pub_date',),
+    }
+    select_related_fields = {'author': 'author'}
+    # дата нужна курсорной пагинации
+    always_loaded_fields = ('id', 'pub_date')
 
     def get_queryset(self):
         review_id = self.kwargs.get('review_id')
-        return Comment.objects.filter(review_id=review_id)
+        return Comment.objects.filter(
+            review_id=review_id
+        ).select_related('author').only(
+            'id', 'review', 'text', 'pub_date', 'author', 'author__username',
+        )
 
     def perform_create(self, serializer):
         serializer.is_valid(raise_exception=True)
         # если выше ошибка, дальше не пойдет
         serializer.save(
-            author=self.request.user,
+            author_id=self.request.user.pk,
             review=get_object_or_404(
                 Review,
                 pk=self.kwargs.get('review_id'))
         )
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        # у Comment нет обработчика post_delete (см. api.signals),
+        # поэтому кэш комментариев сбрасываем здесь
+        bump_on_commit('comments')
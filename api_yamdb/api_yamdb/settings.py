@@ -22,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'reviews.apps.ReviewsConfig',
     'api.apps.ApiConfig',
     'rest_framework',
@@ -29,6 +30,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -119,22 +121,87 @@ REST_FRAMEWORK = {
     'rest_framework.pagination.LimitOffsetPagination',
     'LIMIT': 5,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'PAGE_SIZE': 10,
+    # JSON через orjson, если он установлен
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # запросов кода подтверждения с одного адреса
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '5/hour',
+    },
 }
 SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
 }
+# записывать роль пользователя в JWT, чтобы проверять права без БД
+JWT_ROLE_CLAIMS = strtobool(os.getenv('JWT_ROLE_CLAIMS', default='False'))
+# сколько секунд версия прав пользователя живет в кэше API: столько
+# токен с прежней ролью может приниматься процессом, который не видел
+# изменения (другой воркер, manage.py, запись через .update())
+JWT_ROLE_VERSION_TIMEOUT = 30
+# кэш пользователей для аутентификации по JWT: LRU в памяти процесса
+AUTH_USER_CACHE_SIZE = 1024
+# сколько секунд снимок пользователя живет в памяти процесса
+AUTH_USER_CACHE_TIMEOUT = 30
+# общий для процессов кэш снимков, например 'default' с Redis
+AUTH_USER_CACHE_ALIAS = os.getenv('AUTH_USER_CACHE_ALIAS') or None
+AUTH_USER_SHARED_CACHE_TIMEOUT = 60 * 5
+# как часто процесс сверяется с общим кэшем, не меняли ли пользователей
+# в других процессах: столько секунд там еще принимается
+# заблокированный пользователь или прежняя роль
+AUTH_USER_CACHE_CHECK_INTERVAL = 1
 # Модуль для отправки писем
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
-AUTHENTICATION_BACKENDS = (
-    'django.contrib.auth.backends.ModelBackend',
-    'api.backends.AuthenticationWithoutPasswordBackend',
-)
 FROM_EMAIL = 'no-reply@yamdb.ru'
+# срок действия кода подтверждения, в секундах
+CONFIRMATION_CODE_TIMEOUT = 60 * 60 * 24
+# очередь исходящих писем (команда send_outbox)
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# задержка перед повтором удваивается с каждой попыткой, в секундах
+EMAIL_OUTBOX_RETRY_DELAY = 60
+EMAIL_OUTBOX_MAX_DELAY = 60 * 60
+# на сколько секунд обработчик забирает письма из очереди
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 60 * 5
+# после скольких писем записывать результат отправки в БД
+EMAIL_SEND_BATCH_SIZE = 50
+
+# Кэш ответов API. По умолчанию - локальная память процесса,
+# для нескольких воркеров и команд manage.py нужен общий
+# Redis-совместимый backend (так настроен infra/docker-compose.yaml):
+# CACHE_BACKEND=django_redis.cache.RedisCache
+# CACHE_LOCATION=redis://redis:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    }
+}
+API_CACHE_ALIAS = 'default'
+# время жизни закэшированного ответа, в секундах
+API_CACHE_TIMEOUT = 60 * 10
+# сколько объектов можно передать в один запрос /bulk/
+API_BULK_MAX_ITEMS = 1000
+# списки произведений, отзывов и комментариев сериализуются
+# из .values() без ModelSerializer
+API_VALUES_LIST = True
+# заголовок X-DB-Query-Count с количеством запросов к БД
+API_QUERY_COUNT_HEADER = strtobool(
+    os.getenv('API_QUERY_COUNT_HEADER', default=str(DEBUG))
+)
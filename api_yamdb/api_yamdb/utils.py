@@ -0,0 +1,50 @@
+from itertools import islice
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def iter_chunks(iterable, chunk_size):
+    """Разбивает поток объектов на списки по chunk_size штук."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def is_constraint_violation(error, model, name):
+    """
+    Вызвана ли ошибка IntegrityError нарушением ограничения name модели.
+    PostgreSQL сообщает имя ограничения, SQLite - только его колонки.
+    """
+    diag = getattr(error.__cause__, 'diag', None)
+    if diag is not None:
+        return diag.constraint_name == name
+    constraint = next(
+        (item for item in model._meta.constraints if item.name == name),
+        None
+    )
+    if constraint is None:
+        return False
+    columns = ', '.join(
+        f'{model._meta.db_table}.{model._meta.get_field(field).column}'
+        for field in constraint.fields
+    )
+    return str(error).endswith(columns)
+
+
+def local_cache_warning(alias):
+    """
+    Предупреждение для команд manage.py: кэш alias хранится в памяти
+    процесса команды, и сброс версий не дойдет до запущенного сервера.
+    None - если кэш общий.
+    """
+    if not isinstance(caches[alias], LocMemCache):
+        return None
+    return (
+        'Кэш API хранится в памяти процесса: запущенный сервер увидит '
+        'изменения не раньше чем через API_CACHE_TIMEOUT секунд. '
+        'Для общего кэша задайте CACHE_BACKEND и CACHE_LOCATION'
+    )
@@ -14,6 +14,7 @@ class TitleAdmin(admin.ModelAdmin):
     )
     search_fields = ("name",)
     list_filter = ("year",)
+    readonly_fields = ("rating_sum", "rating_count",)
 
 
 # Register your models here.
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ReviewsConfig(AppConfig):
     name = 'reviews'
+
+    def ready(self):
+        # регистрируем обработчики сигналов
+        from . import signals  # noqa: F401
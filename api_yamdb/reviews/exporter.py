@@ -0,0 +1,56 @@
+import csv
+import gzip
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def iter_rows(queryset, columns, chunk_size):
+    """
+    Построчно читает queryset через серверный курсор,
+    не загружая таблицу в память целиком.
+    """
+    return queryset.order_by('pk').values_list(*columns).iterator(
+        chunk_size=chunk_size
+    )
+
+
+def write_csv(path, columns, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        count = 0
+        for row in rows:
+            writer.writerow(
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in row
+            )
+            count += 1
+    return count
+
+
+def _write_json_lines(f, columns, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    count = 0
+    for row in rows:
+        f.write(encoder.encode(dict(zip(columns, row))))
+        f.write('\n')
+        count += 1
+    return count
+
+
+def write_jsonl(path, columns, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        return _write_json_lines(f, columns, rows)
+
+
+def write_ndjson_gz(path, columns, rows):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        return _write_json_lines(f, columns, rows)
+
+
+# формат -> (расширение файла, функция записи)
+WRITERS = {
+    'csv': ('csv', write_csv),
+    'jsonl': ('jsonl', write_jsonl),
+    'ndjson.gz': ('ndjson.gz', write_ndjson_gz),
+}
@@ -0,0 +1,194 @@
+import copy
+import csv
+import time
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.db import connection, connections, transaction
+from django.db.models import Index
+
+from api_yamdb.utils import iter_chunks
+
+
+def read_chunks(file_name, chunk_size):
+    """Читает csv-файл частями, первая строка - заголовки."""
+    with open(file_name, newline='', encoding='utf-8') as f:
+        yield from iter_chunks(csv.DictReader(f), chunk_size)
+
+
+def get_columns(model, headers):
+    """Сопоставляет заголовки файла с полями модели."""
+    columns = {}
+    for header in headers:
+        field = model._meta.get_field(header)
+        columns[header] = field
+    return columns
+
+
+def build_objects(model, rows, columns, related_ids):
+    """
+    Создает экземпляры модели без запросов к БД.
+    Внешние ключи проверяются по заранее загруженным множествам id.
+    Возвращает объекты и количество пропущенных строк.
+    """
+    objects = []
+    skipped = 0
+    for row in rows:
+        values = {}
+        for header, field in columns.items():
+            value = row[header]
+            if field.is_relation:
+                value = int(value) if value else None
+                if (value is not None
+                        and value not in related_ids[field.related_model]):
+                    break
+            elif field.primary_key:
+                # иначе upsert не узнает уже загруженные строки
+                value = field.to_python(value)
+            values[field.attname] = value
+        else:
+            objects.append(model(**values))
+            continue
+        skipped += 1
+    return objects, skipped
+
+
+def upsert(model, objects, fields):
+    """
+    Идемпотентная запись: существующие по pk строки обновляются,
+    новые вставляются одним запросом на пачку.
+    """
+    pks = [obj.pk for obj in objects]
+    existing = set(
+        model.objects.filter(pk__in=pks).values_list('pk', flat=True)
+    )
+    new_objects = [obj for obj in objects if obj.pk not in existing]
+    old_objects = [obj for obj in objects if obj.pk in existing]
+    # bulk_create записывает в поля auto_now_add текущее время,
+    # даты из файла возвращаем отдельным обновлением
+    auto_fields = [
+        name for name in fields
+        if getattr(model._meta.get_field(name), 'auto_now_add', False)
+    ]
+    dates = [
+        [getattr(obj, name) for name in auto_fields] for obj in new_objects
+    ]
+    model.objects.bulk_create(new_objects, ignore_conflicts=True)
+    if auto_fields and new_objects:
+        for obj, values in zip(new_objects, dates):
+            for name, value in zip(auto_fields, values):
+                if value:
+                    setattr(obj, name, value)
+        model.objects.bulk_update(new_objects, auto_fields)
+    update_fields = [name for name in fields if name != model._meta.pk.name]
+    if old_objects and update_fields:
+        model.objects.bulk_update(old_objects, update_fields)
+
+
+def load_table(model, file_name, chunk_size):
+    """
+    Загружает таблицу из csv в одной транзакции.
+    Возвращает количество загруженных и пропущенных строк и время.
+    """
+    started = time.monotonic()
+    loaded = skipped = 0
+    with transaction.atomic():
+        columns = None
+        related_ids = {}
+        for rows in read_chunks(file_name, chunk_size):
+            if columns is None:
+                columns = get_columns(model, rows[0].keys())
+                for field in columns.values():
+                    if field.is_relation:
+                        related_ids[field.related_model] = set(
+                            field.related_model.objects.values_list(
+                                'pk', flat=True
+                            )
+                        )
+            objects, rows_skipped = build_objects(
+                model, rows, columns, related_ids
+            )
+            upsert(model, objects, [field.name for field in columns.values()])
+            loaded += len(objects)
+            skipped += rows_skipped
+    return loaded, skipped, time.monotonic() - started
+
+
+def load_table_in_worker(model_label, file_name, chunk_size):
+    """
+    Загрузка таблицы в отдельном процессе.
+    Модель передается меткой, соединение с БД у процесса свое.
+    """
+    try:
+        return load_table(
+            apps.get_model(model_label), file_name, chunk_size
+        )
+    finally:
+        connections.close_all()
+
+
+def get_dependencies(models):
+    """
+    Граф зависимостей по внешним ключам: для каждой модели -
+    множество моделей из того же набора, на которые она ссылается.
+    """
+    dependencies = {}
+    for model in models:
+        dependencies[model] = {
+            field.related_model
+            for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model in models
+            and field.related_model is not model
+        }
+    return dependencies
+
+
+def without_constraint(field):
+    """Копия поля внешнего ключа без ограничения в БД."""
+    unconstrained = copy.copy(field)
+    unconstrained.db_constraint = False
+    return unconstrained
+
+
+def drop_indexes(models):
+    """
+    Удаляет индексы из Meta.indexes и ограничения внешних ключей
+    перед большой загрузкой (только PostgreSQL).
+    Возвращает то, что нужно восстановить после загрузки.
+    """
+    dropped = []
+    with connection.schema_editor() as editor:
+        for model in models:
+            for index in model._meta.indexes:
+                editor.remove_index(model, index)
+                dropped.append((model, index))
+            for field in model._meta.local_fields:
+                if field.remote_field and field.db_constraint:
+                    editor.alter_field(
+                        model, field, without_constraint(field)
+                    )
+                    dropped.append((model, field))
+    return dropped
+
+
+def restore_indexes(dropped):
+    """Восстанавливает удаленные индексы и внешние ключи."""
+    with connection.schema_editor() as editor:
+        for model, item in dropped:
+            if isinstance(item, Index):
+                editor.add_index(model, item)
+            else:
+                editor.alter_field(model, without_constraint(item), item)
+
+
+@contextmanager
+def indexes_dropped(models):
+    """
+    Индексы и внешние ключи моделей удалены на время блока
+    и восстанавливаются, даже если загрузка упала.
+    """
+    dropped = drop_indexes(models)
+    try:
+        yield
+    finally:
+        restore_indexes(dropped)
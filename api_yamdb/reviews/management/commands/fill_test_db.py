@@ -1,76 +1,194 @@
-import csv
-from sys import stdout
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections
 
+from api_yamdb.utils import local_cache_warning
+
+from ...importer import (get_dependencies, indexes_dropped, load_table,
+                         load_table_in_worker)
 from ...models import Category, Comment, Genre, Review, Title
+from ...ratings import rebuild_ratings
+from ...signals import models_bulk_changed
 
 User = get_user_model()
 
+# таблица -> модель, порядок загрузки определяется внешними ключами
+TABLE_MODEL_MAPPING = {
+    'category': Category,
+    'genre': Genre,
+    'users': User,
+    'titles': Title,
+    'genre_title': Title.genre.through,
+    'review': Review,
+    'comments': Comment,
+}
+
 
 class Command(BaseCommand):
     """
     Класс позволяет автоматически заполнить данные
     в базе на основе таблиц.
+    Файлы читаются частями и пишутся пачками через bulk_create,
+    повторный запуск обновляет уже загруженные строки.
+    Независимые таблицы грузятся параллельно в нескольких процессах,
+    зависимая таблица начинает грузиться сразу после своих родителей.
     """
     help = 'import data'
 
-    def _load_table_data(self, file_name, model_name):
-        """Функция создает записи в таблице"""
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с csv-файлами <таблица>.csv',
+        )
+        parser.add_argument(
+            '--file',
+            action='append',
+            default=[],
+            metavar='TABLE=PATH',
+            help='Путь к файлу отдельной таблицы, например review=/tmp/r.csv',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной пачке',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=min(os.cpu_count() or 1, 4),
+            help='Количество процессов загрузки',
+        )
+        parser.add_argument(
+            '--drop-indexes',
+            action='store_true',
+            help='Удалить индексы и внешние ключи на время загрузки',
+        )
+
+    def handle(self, *args, **options):
+        # основной метод команды, из которого вызываем служебные функции
+        self.chunk_size = options['chunk_size']
+        files = self._get_files(options['data_dir'], options['file'])
+        models = [TABLE_MODEL_MAPPING[table] for table in files]
+        workers = options['workers']
+        if connection.vendor != 'postgresql':
+            # SQLite не умеет писать из нескольких процессов сразу
+            workers = 1
+
+        if options['drop_indexes'] and connection.vendor == 'postgresql':
+            context = indexes_dropped(models)
+        else:
+            context = nullcontext()
+        with context:
+            if workers > 1:
+                self._load_parallel(files, workers)
+            else:
+                self._load_sequential(files)
 
-        # данный словарь нужен, чтобы функция поменяла, для каких
-        # полей надо брать экземпляр класса
-        mapping_field_model = {
-            'category': Category,
-            'author': User,
-            'genre_id': Genre,
+        self._reset_sequences(models)
+        # bulk_create не вызывает сигналы, рейтинг считаем заново
+        rebuild_ratings()
+        models_bulk_changed.send(sender=Title)
+        warning = local_cache_warning(settings.API_CACHE_ALIAS)
+        if warning:
+            self.stdout.write(self.style.WARNING(warning))
+
+    def _get_files(self, data_dir, file_options):
+        """Пути к файлам таблиц, отсутствующие файлы пропускаются."""
+        files = {
+            table: os.path.join(data_dir, f'{table}.csv')
+            for table in TABLE_MODEL_MAPPING
         }
+        for option in file_options:
+            table, _, path = option.partition('=')
+            if table not in TABLE_MODEL_MAPPING or not path:
+                raise CommandError(
+                    f'Неверное значение --file {option}, таблицы: '
+                    f'{", ".join(TABLE_MODEL_MAPPING)}'
+                )
+            files[table] = path
+        for table, path in list(files.items()):
+            if not os.path.exists(path):
+                self.stdout.write(
+                    self.style.WARNING(f'Skipped {table}: no file {path}')
+                )
+                del files[table]
+        return files
+
+    def _get_ready(self, files, dependencies, done, started):
+        """Таблицы, все родители которых уже загружены."""
+        return [
+            table for table in files
+            if table not in started
+            and dependencies[TABLE_MODEL_MAPPING[table]] <= done
+        ]
+
+    def _load_sequential(self, files):
+        dependencies = get_dependencies(list(TABLE_MODEL_MAPPING.values()))
+        done = self._missing_models(files)
+        started = set()
+        while len(started) < len(files):
+            for table in self._get_ready(files, dependencies, done, started):
+                started.add(table)
+                self._report(table, load_table(
+                    TABLE_MODEL_MAPPING[table], files[table], self.chunk_size
+                ))
+                done.add(TABLE_MODEL_MAPPING[table])
 
-        # открываем файл
-        with open(file_name, newline='', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for idx, table_line in enumerate(reader):
-                table_line_dict = {}
-                if idx == 0:
-                    # считаем, что в первой строке всегда хранятся заголовки
-                    headers = table_line
-                    continue
-                for idx2, table_line_item in enumerate(table_line):
-                    # по очереди читаем строки, делаем из них словарь
-                    if headers[idx2] in mapping_field_model.keys():
-                        # если поле-foreign key, то создаем экземпляр объекта
-                        model_instance = mapping_field_model[
-                            headers[idx2]
-                        ].objects.get(pk=table_line_item)
-                        table_line_dict[headers[idx2]] = model_instance
-                    else:
-                        table_line_dict[headers[idx2]] = table_line_item
-
-                if table_line_dict:
-                    # выводим в консоль, чтобы было видно, что грузим
-                    stdout.write(str(table_line_dict))
-                    stdout.write('||')
-                    obj, created = model_name.objects.update_or_create(
-                        **table_line_dict
+    def _load_parallel(self, files, workers):
+        dependencies = get_dependencies(list(TABLE_MODEL_MAPPING.values()))
+        done = self._missing_models(files)
+        started = set()
+        running = {}
+        # дочерние процессы должны открыть собственные соединения
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('fork'),
+        ) as executor:
+            while len(started) < len(files) or running:
+                for table in self._get_ready(files, dependencies, done,
+                                             started):
+                    started.add(table)
+                    future = executor.submit(
+                        load_table_in_worker,
+                        TABLE_MODEL_MAPPING[table]._meta.label,
+                        files[table],
+                        self.chunk_size,
                     )
+                    running[future] = table
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    table = running.pop(future)
+                    self._report(table, future.result())
+                    done.add(TABLE_MODEL_MAPPING[table])
 
-    def handle(self, *args, **options):
-        # основной метод команды, из которого вызываем служебную функцию
-        static_folder = settings.STATICFILES_DIRS[0]
-        file_path_model_mapping = {
-            'data\\category.csv': Category,
-            'data\\genre.csv': Genre,
-            'data\\users.csv': User,
-            'data\\titles.csv': Title,
-            'data\\review.csv': Review,
-            'data\\comments.csv': Comment,
+    def _missing_models(self, files):
+        """Модели без файла считаем уже загруженными."""
+        return {
+            model for table, model in TABLE_MODEL_MAPPING.items()
+            if table not in files
         }
 
-        for file_name, model_name in file_path_model_mapping.items():
-            file_full_path = f'{static_folder}{file_name}'
-            Command._load_table_data(file_full_path, model_name)
-            self.stdout.write(
-                self.style.SUCCESS(f'Successfully updated from {file_name}')
-            )
+    def _report(self, table, result):
+        loaded, skipped, elapsed = result
+        models_bulk_changed.send(sender=TABLE_MODEL_MAPPING[table])
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully updated {table}: {loaded} rows, '
+            f'{skipped} skipped, {loaded / max(elapsed, 1e-6):.0f} rows/s'
+        ))
+
+    def _reset_sequences(self, models):
+        """Строки загружены с явными id - сдвигаем счетчики в БД."""
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api_yamdb.utils import local_cache_warning
+
+from ...models import Title
+from ...ratings import rebuild_ratings
+from ...signals import models_bulk_changed
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает сохраненный рейтинг произведений
+    (сумму и количество оценок) по таблице отзывов.
+    """
+    help = 'rebuild title ratings'
+
+    def handle(self, *args, **options):
+        updated = rebuild_ratings()
+        models_bulk_changed.send(sender=Title)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Successfully rebuilt ratings for {updated} titles'
+            )
+        )
+        warning = local_cache_warning(settings.API_CACHE_ALIAS)
+        if warning:
+            self.stdout.write(self.style.WARNING(warning))
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api_yamdb.utils import local_cache_warning
+
+from ...rankings import BOARD_WINDOWS, refresh_rankings
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает рейтинги произведений (таблица TitleRanking).
+    Запускается периодически, например из cron; пока идет пересчет,
+    API отдает прежние места.
+    """
+    help = 'refresh title leaderboards'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'boards',
+            nargs='*',
+            choices=list(BOARD_WINDOWS),
+            help='Какие рейтинги пересчитать, по умолчанию все',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько мест записывать одним запросом',
+        )
+
+    def handle(self, *args, **options):
+        counts = refresh_rankings(
+            options['boards'] or None, options['batch_size']
+        )
+        for board, count in counts.items():
+            self.stdout.write(
+                self.style.SUCCESS(f'Refreshed {board}: {count} positions')
+            )
+        warning = local_cache_warning(settings.API_CACHE_ALIAS)
+        if warning:
+            self.stdout.write(self.style.WARNING(warning))
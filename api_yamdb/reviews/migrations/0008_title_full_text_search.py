@@ -0,0 +1,99 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:41
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION reviews_title_search_vector_update()
+RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER reviews_title_search_vector_trigger
+BEFORE INSERT OR UPDATE OF name, description ON reviews_title
+FOR EACH ROW EXECUTE PROCEDURE reviews_title_search_vector_update();
+
+UPDATE reviews_title SET name = name;
+
+CREATE INDEX reviews_title_search_vector_gin
+ON reviews_title USING gin (search_vector);
+"""
+
+DROP_SEARCH_TRIGGER_SQL = """
+DROP INDEX IF EXISTS reviews_title_search_vector_gin;
+DROP TRIGGER IF EXISTS reviews_title_search_vector_trigger ON reviews_title;
+DROP FUNCTION IF EXISTS reviews_title_search_vector_update();
+"""
+
+# триграммные индексы: для короткого поиска по названию и для
+# icontains (UPPER(name) LIKE ...) в фильтрах и SearchFilter
+TRIGRAM_SQL = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX reviews_title_name_trgm
+ON reviews_title USING gin (name gin_trgm_ops);
+
+CREATE INDEX reviews_title_upper_name_trgm
+ON reviews_title USING gin ((UPPER(name::text)) gin_trgm_ops);
+
+CREATE INDEX reviews_genre_upper_name_trgm
+ON reviews_genre USING gin ((UPPER(name::text)) gin_trgm_ops);
+
+CREATE INDEX reviews_category_upper_name_trgm
+ON reviews_category USING gin ((UPPER(name::text)) gin_trgm_ops);
+"""
+
+DROP_TRIGRAM_SQL = """
+DROP INDEX IF EXISTS reviews_title_name_trgm;
+DROP INDEX IF EXISTS reviews_title_upper_name_trgm;
+DROP INDEX IF EXISTS reviews_genre_upper_name_trgm;
+DROP INDEX IF EXISTS reviews_category_upper_name_trgm;
+"""
+
+
+def has_trigram_extension(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        return cursor.fetchone() is not None
+
+
+def create_search(apps, schema_editor):
+    # триггеры и GIN-индексы есть только в PostgreSQL,
+    # в остальных БД поиск работает через icontains
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(SEARCH_TRIGGER_SQL)
+    if has_trigram_extension(schema_editor):
+        schema_editor.execute(TRIGRAM_SQL)
+
+
+def drop_search(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(DROP_TRIGRAM_SQL)
+    schema_editor.execute(DROP_SEARCH_TRIGGER_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_feed_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search, drop_search),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_full_text_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', 'score'], name='reviews_rev_title_i_413aec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'year'], name='reviews_tit_categor_245be9_idx'),
+        ),
+        # фильтр по жанру идет через промежуточную таблицу, у которой
+        # из коробки есть только unique (title_id, genre_id)
+        migrations.RunSQL(
+            'CREATE INDEX reviews_title_genre_genre_title_idx '
+            'ON reviews_title_genre (genre_id, title_id);',
+            'DROP INDEX reviews_title_genre_genre_title_idx;',
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
@@ -15,28 +16,11 @@ USER_ROLES = [
 ]
 
 
-# Create new User Model
-class User(AbstractUser):
-    bio = models.TextField(
-        verbose_name='Биография',
-        help_text='Информация о пользователе',
-        blank=True,
-        null=True
-    )
-    role = models.CharField(
-        max_length=25,
-        choices=USER_ROLES,
-        verbose_name='Роль',
-        help_text='Роль пользователя',
-        default=USER_ROLE,  # по умолчанию просто пользователь
-        blank=False,
-        null=False,
-    )
-    confirmation_code = models.CharField(
-        max_length=36,
-        # это нужно, чтобы из под админа потом можно было нормально зайти
-        default='123456',
-    )
+class UserRoleMixin:
+    """
+    Проверки роли пользователя. Нужны только поля role и is_staff,
+    поэтому подходят и для пользователя, собранного из JWT.
+    """
 
     @property
     def is_admin(self):
@@ -60,6 +44,69 @@ class User(AbstractUser):
         return False
 
 
+# Create new User Model
+class User(UserRoleMixin, AbstractUser):
+    # поля, от которых зависят права доступа пользователя
+    ACCESS_FIELDS = ('role', 'is_staff', 'is_superuser', 'is_active')
+
+    bio = models.TextField(
+        verbose_name='Биография',
+        help_text='Информация о пользователе',
+        blank=True,
+        null=True
+    )
+    role = models.CharField(
+        max_length=25,
+        choices=USER_ROLES,
+        verbose_name='Роль',
+        help_text='Роль пользователя',
+        default=USER_ROLE,  # по умолчанию просто пользователь
+        blank=False,
+        null=False,
+    )
+    # увеличивается при каждой смене прав, токены с прежней
+    # версией прав перестают приниматься
+    role_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия прав доступа',
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # запоминаем права из БД, чтобы при сохранении
+        # заметить их изменение без дополнительного запроса
+        loaded = dict(zip(field_names, values))
+        if all(field in loaded for field in cls.ACCESS_FIELDS):
+            instance._loaded_access = tuple(
+                loaded[field] for field in cls.ACCESS_FIELDS
+            )
+        return instance
+
+    def get_access(self):
+        return tuple(getattr(self, field) for field in self.ACCESS_FIELDS)
+
+    def access_changed(self):
+        if self._state.adding or self.pk is None:
+            return False
+        loaded = getattr(self, '_loaded_access', None)
+        if loaded is None:
+            loaded = type(self).objects.filter(pk=self.pk).values_list(
+                *self.ACCESS_FIELDS
+            ).first()
+        return loaded is not None and loaded != self.get_access()
+
+    def save(self, *args, **kwargs):
+        if self.access_changed():
+            self.role_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'role_version'}
+        super().save(*args, **kwargs)
+        self._loaded_access = self.get_access()
+
+
 class Category(models.Model):
     """Модель категорий произведений."""
     name = models.CharField(max_length=256, verbose_name="Категория")
@@ -106,14 +153,39 @@ class Title(models.Model):
                                  verbose_name="Категория_произведения",
                                  )
     genre = models.ManyToManyField(Genre, related_name="titles", blank=True)
+    # сумма и количество оценок поддерживаются сигналами отзывов,
+    # чтобы не считать Avg по всей таблице отзывов на каждый запрос
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Сумма оценок"
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество оценок"
+    )
+    # заполняется триггером в PostgreSQL по name и description
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name_plural = "Произведения"
         verbose_name = "Произведение"
+        indexes = [
+            # фильтр по категории и году
+            models.Index(fields=['category', 'year'])
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка произведения, None - если оценок еще нет."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
 
 class Review(models.Model):
     """Модель отзывов о произведении."""
@@ -151,10 +223,26 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # запоминаем значения из БД, чтобы при изменении отзыва
+        # пересчитать рейтинг произведения без дополнительного запроса
+        loaded = dict(zip(field_names, values))
+        if 'title_id' in loaded and 'score' in loaded:
+            instance._loaded_rating = (loaded['title_id'], loaded['score'])
+        return instance
+
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = [
+            # для курсорной пагинации ленты отзывов произведения
+            models.Index(fields=['title', 'pub_date', 'id']),
+            # для пересчета рейтинга и статистики оценок
+            models.Index(fields=['title', 'score']),
+        ]
 
         constraints = [
             models.UniqueConstraint(
@@ -196,3 +284,62 @@ class Comment(models.Model):
         ordering = ['-pub_date']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        # для курсорной пагинации ленты комментариев к отзыву
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'])
+        ]
+
+
+TOP_BOARD = 'top'
+TRENDING_WEEK_BOARD = 'trending-week'
+TRENDING_MONTH_BOARD = 'trending-month'
+
+BOARDS = [
+    (TOP_BOARD, 'Лучшие по рейтингу'),
+    (TRENDING_WEEK_BOARD, 'Больше всего отзывов за неделю'),
+    (TRENDING_MONTH_BOARD, 'Больше всего отзывов за месяц'),
+]
+
+
+class TitleRanking(models.Model):
+    """
+    Заранее посчитанные места произведений в рейтингах.
+    Без категории и жанра - общий рейтинг, с категорией или жанром -
+    рейтинг внутри нее. Пересчитывается командой refresh_rankings.
+    """
+    board = models.CharField(max_length=20, choices=BOARDS)
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        blank=True,
+        null=True,
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        blank=True,
+        null=True,
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+    )
+    position = models.PositiveIntegerField(verbose_name='Место')
+    score = models.FloatField(verbose_name='Средняя оценка')
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов'
+    )
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинги произведений'
+        indexes = [
+            # страница рейтинга читается диапазоном по этому индексу
+            models.Index(fields=['board', 'category', 'genre', 'position'])
+        ]
+
+    def __str__(self):
+        return f'{self.board} #{self.position}: {self.title_id}'
@@ -0,0 +1,120 @@
+import zlib
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from api_yamdb.utils import iter_chunks
+
+from .models import (TOP_BOARD, TRENDING_MONTH_BOARD, TRENDING_WEEK_BOARD,
+                     Review, Title, TitleRanking)
+from .signals import models_bulk_changed
+
+# за какой период считаются отзывы, None - за все время
+BOARD_WINDOWS = {
+    TOP_BOARD: None,
+    TRENDING_WEEK_BOARD: timedelta(days=7),
+    TRENDING_MONTH_BOARD: timedelta(days=30),
+}
+
+# ключ блокировки, чтобы два пересчета не выполнялись одновременно
+REFRESH_LOCK_KEY = zlib.crc32(b'reviews.TitleRanking')
+
+
+def get_board_rows(board):
+    """
+    Произведения рейтинга в порядке мест:
+    словари с title_id, category_id, score и review_count.
+    """
+    window = BOARD_WINDOWS[board]
+    if window is None:
+        # общий рейтинг - по поддерживаемым счетчикам оценок,
+        # без агрегации по таблице отзывов
+        return Title.objects.filter(rating_count__gt=0).annotate(
+            title_id=F('pk'),
+            score=ExpressionWrapper(
+                Cast('rating_sum', FloatField()) / F('rating_count'),
+                output_field=FloatField(),
+            ),
+            review_count=F('rating_count'),
+        ).order_by('-score', '-review_count', 'pk').values(
+            'title_id', 'category_id', 'score', 'review_count'
+        )
+    return Review.objects.filter(
+        pub_date__gte=timezone.now() - window
+    ).order_by().values(
+        'title_id', category_id=F('title__category_id')
+    ).annotate(
+        score=Avg('score'),
+        review_count=Count('id'),
+    ).order_by('-review_count', '-score', 'title_id')
+
+
+def get_title_genres():
+    """Жанры всех произведений одним запросом."""
+    genres = defaultdict(list)
+    through = Title.genre.through.objects.values_list('title_id', 'genre_id')
+    for title_id, genre_id in through.iterator():
+        genres[title_id].append(genre_id)
+    return genres
+
+
+def build_rankings(board, rows, title_genres):
+    """Места в общем рейтинге и внутри каждой категории и жанра."""
+    positions = Counter()
+    for row in rows:
+        scopes = [{}]
+        if row['category_id'] is not None:
+            scopes.append({'category_id': row['category_id']})
+        scopes.extend(
+            {'genre_id': genre_id}
+            for genre_id in title_genres.get(row['title_id'], ())
+        )
+        for scope in scopes:
+            key = tuple(scope.items())
+            positions[key] += 1
+            yield TitleRanking(
+                board=board,
+                title_id=row['title_id'],
+                position=positions[key],
+                score=row['score'],
+                review_count=row['review_count'],
+                **scope
+            )
+
+
+def refresh_rankings(boards=None, batch_size=1000):
+    """
+    Пересчитывает рейтинги в одной транзакции. До коммита читатели
+    видят прежние места и не ждут пересчета.
+    Возвращает количество записанных мест по каждому рейтингу.
+    """
+    if boards is None:
+        boards = list(BOARD_WINDOWS)
+    table = connection.ops.quote_name(TitleRanking._meta.db_table)
+    counts = {}
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_advisory_xact_lock(%s)', [REFRESH_LOCK_KEY]
+                )
+        title_genres = get_title_genres()
+        for board in boards:
+            # удаляем одним запросом, без загрузки строк ради сигналов
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE board = %s', [board]
+                )
+            rankings = build_rankings(
+                board, get_board_rows(board).iterator(), title_genres
+            )
+            counts[board] = 0
+            for chunk in iter_chunks(rankings, batch_size):
+                TitleRanking.objects.bulk_create(chunk)
+                counts[board] += len(chunk)
+        models_bulk_changed.send(sender=TitleRanking)
+    return counts
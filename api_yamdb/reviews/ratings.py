@@ -0,0 +1,82 @@
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Review, Title
+
+
+def apply_rating_delta(title_id, score_delta, count_delta):
+    """
+    Атомарно изменяет сумму и количество оценок произведения.
+    Возвращает количество обновленных строк.
+    """
+    if not score_delta and not count_delta:
+        return 0
+    return Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta,
+    )
+
+
+def rebuild_ratings(queryset=None):
+    """
+    Пересчитывает рейтинг произведений по таблице отзывов
+    одним UPDATE-запросом. Возвращает количество обновленных строк.
+    """
+    if queryset is None:
+        queryset = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    return queryset.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')),
+            0
+        ),
+    )
+
+
+SCORES = range(1, 11)
+
+
+def get_score_stats(title_id):
+    """
+    Количество, среднее, медиана и гистограмма оценок произведения
+    по одному сгруппированному запросу. None - если произведения нет.
+    """
+    rows = Title.objects.filter(pk=title_id).order_by().values(
+        'reviews__score'
+    ).annotate(count=Count('reviews'))
+    if not rows:
+        return None
+    histogram = dict.fromkeys(SCORES, 0)
+    for row in rows:
+        if row['reviews__score'] is not None:
+            histogram[row['reviews__score']] = row['count']
+    count = sum(histogram.values())
+    if not count:
+        return {
+            'count': 0, 'mean': None, 'median': None, 'histogram': histogram
+        }
+    return {
+        'count': count,
+        'mean': sum(score * number for score, number in histogram.items())
+        / count,
+        'median': get_median(histogram, count),
+        'histogram': histogram,
+    }
+
+
+def get_median(histogram, count):
+    """Медиана по гистограмме: среднее двух средних оценок при четном."""
+    middle = ((count - 1) // 2, count // 2)
+    values = []
+    seen = 0
+    for score, number in histogram.items():
+        seen += number
+        while len(values) < 2 and middle[len(values)] < seen:
+            values.append(score)
+    return sum(values) / 2
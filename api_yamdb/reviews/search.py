@@ -0,0 +1,45 @@
+from functools import lru_cache
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Q
+
+# запросы короче этого ищутся по триграммам названия:
+# полнотекстовый поиск не находит обрывки слов
+FULL_TEXT_MIN_LENGTH = 4
+SEARCH_CONFIGS = ('russian', 'english')
+
+
+@lru_cache(maxsize=None)
+def has_trigram_extension():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def search_titles(queryset, value):
+    """
+    Поиск произведений по названию и описанию.
+    В PostgreSQL - полнотекстовый поиск по search_vector
+    с ранжированием, для коротких запросов - по триграммам названия.
+    В остальных БД (например, в тестах на SQLite) - icontains.
+    """
+    value = value.strip()
+    if not value:
+        return queryset
+    if connection.vendor != 'postgresql':
+        return queryset.filter(
+            Q(name__icontains=value) | Q(description__icontains=value)
+        )
+    if len(value) < FULL_TEXT_MIN_LENGTH:
+        if not has_trigram_extension():
+            return queryset.filter(name__icontains=value)
+        return queryset.filter(
+            Q(name__trigram_similar=value) | Q(name__icontains=value)
+        )
+    query = SearchQuery(value, config=SEARCH_CONFIGS[0])
+    for config in SEARCH_CONFIGS[1:]:
+        query |= SearchQuery(value, config=config)
+    return queryset.filter(search_vector=query).annotate(
+        rank=SearchRank(F('search_vector'), query)
+    ).order_by('-rank', 'pk')
@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .models import Review
+from .ratings import apply_rating_delta
+
+# массовая запись в модель в обход save() / delete(),
+# например bulk_create при импорте данных
+models_bulk_changed = Signal()
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, raw, **kwargs):
+    """
+    Если отзыв был загружен не целиком (или создан вручную с pk),
+    достаем из БД прежние произведение и оценку.
+    """
+    if raw or instance.pk is None or hasattr(instance, '_loaded_rating'):
+        return
+    instance._loaded_rating = (
+        Review.objects.filter(pk=instance.pk).values_list(
+            'title_id', 'score'
+        ).first() or (None, None)
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    """Пересчитывает рейтинг произведения при создании/изменении отзыва."""
+    if raw:
+        return
+    old_title_id, old_score = (
+        (None, None) if created
+        else getattr(instance, '_loaded_rating', (None, None))
+    )
+    if created and getattr(instance, '_rating_applied', False):
+        # рейтинг обновил сам создающий код,
+        # см. ReviewViewSet.perform_create
+        pass
+    elif old_title_id is None:
+        apply_rating_delta(instance.title_id, instance.score, 1)
+    elif old_title_id != instance.title_id:
+        # отзыв перенесли на другое произведение
+        apply_rating_delta(old_title_id, -old_score, -1)
+        apply_rating_delta(instance.title_id, instance.score, 1)
+    else:
+        apply_rating_delta(instance.title_id, instance.score - old_score, 0)
+    instance._loaded_rating = (instance.title_id, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Убирает оценку удаленного отзыва из рейтинга произведения."""
+    title_id, score = getattr(
+        instance, '_loaded_rating', (instance.title_id, instance.score)
+    )
+    apply_rating_delta(title_id, -score, -1)
@@ -6,4 +6,6 @@ sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_data',
+    'tests.fixtures.smtp_server',
 ]
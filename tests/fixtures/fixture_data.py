@@ -0,0 +1,138 @@
+import pytest
+
+PAGE_SIZE = 10
+
+
+@pytest.fixture(autouse=True)
+def clear_api_cache():
+    """Кэш ответов API и пользователей не должен переживать тест."""
+    from api.authentication import user_cache
+    from django.core.cache import caches
+
+    caches['default'].clear()
+    user_cache.clear()
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='testadmin@yamdb.fake', role='admin'
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    client = APIClient()
+    token = RefreshToken.for_user(admin)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+    return client
+
+
+@pytest.fixture
+def catalogue(django_user_model):
+    """
+    Наполняет базу так, чтобы на каждой странице было
+    не меньше PAGE_SIZE объектов со связями.
+    """
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(PAGE_SIZE)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(PAGE_SIZE)
+    ]
+    users = [
+        django_user_model.objects.create_user(
+            username=f'user{i}', email=f'user{i}@yamdb.fake'
+        )
+        for i in range(PAGE_SIZE)
+    ]
+    titles = []
+    for i in range(PAGE_SIZE):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i,
+            description='Описание', category=categories[i]
+        )
+        title.genre.set(genres[:2])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=user, text='Отзыв', score=5
+        )
+        for user in users
+    ]
+    for user in users:
+        Comment.objects.create(
+            review=reviews[0], author=user, text='Комментарий'
+        )
+    return {'title': titles[0], 'review': reviews[0]}
+
+
+# небольшой набор таблиц в формате static/data для команды fill_test_db:
+# отзыв 6 ссылается на несуществующее произведение и должен быть пропущен
+CSV_DATA = {
+    'category': [
+        ('id', 'name', 'slug'),
+        (1, 'Фильм', 'movie'),
+        (2, 'Книга', 'book'),
+    ],
+    'genre': [
+        ('id', 'name', 'slug'),
+        (1, 'Драма', 'drama'),
+        (2, 'Комедия', 'comedy'),
+        (3, 'Сказка', 'tale'),
+    ],
+    'users': [
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+        (100, 'bingobongo', 'bingobongo@yamdb.fake', 'user', '', '', ''),
+        (101, 'capt_obvious', 'capt_obvious@yamdb.fake', 'admin', '', '', ''),
+        (102, 'faust', 'faust@yamdb.fake', 'moderator', 'Доктор', '', ''),
+    ],
+    'titles': [
+        ('id', 'name', 'year', 'category'),
+        (1, 'Побег из Шоушенка', 1994, 1),
+        (2, 'Крестный отец', 1972, 1),
+        (3, 'Колобок', 1873, 2),
+        (4, 'Без категории', 2000, ''),
+    ],
+    'genre_title': [
+        ('id', 'title_id', 'genre_id'),
+        (1, 1, 1),
+        (2, 2, 1),
+        (3, 2, 2),
+        (4, 3, 3),
+    ],
+    'review': [
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        (1, 1, 'Отлично', 100, 10, '2019-09-24T21:08:21.567Z'),
+        (2, 1, 'Хорошо', 101, 8, '2019-09-25T10:00:00Z'),
+        (3, 2, 'Средне', 100, 5, '2019-09-26T10:00:00Z'),
+        (4, 2, 'Плохо', 102, 2, '2019-09-27T10:00:00Z'),
+        (5, 3, 'Детское', 102, 7, '2019-09-28T10:00:00Z'),
+        (6, 99, 'Нет произведения', 100, 1, '2019-09-29T10:00:00Z'),
+    ],
+    'comments': [
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        (1, 1, 'Согласен', 101, '2019-09-24T22:00:00Z'),
+        (2, 1, 'Не согласен', 102, '2019-09-24T23:00:00Z'),
+        (3, 3, 'Спорно', 101, '2019-09-26T11:00:00Z'),
+    ],
+}
+
+
+@pytest.fixture
+def csv_data(tmp_path):
+    """Каталог с csv-файлами CSV_DATA, возвращает путь к нему."""
+    import csv
+
+    for table, rows in CSV_DATA.items():
+        with open(tmp_path / f'{table}.csv', 'w', newline='',
+                  encoding='utf-8') as f:
+            csv.writer(f).writerows(rows)
+    return tmp_path
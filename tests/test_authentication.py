@@ -0,0 +1,133 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCachedAuthentication:
+    url = '/api/v1/users/'
+
+    def test_user_is_cached(self, admin_client, django_assert_num_queries):
+        url = '/api/v1/genres/'
+        admin_client.get(url)
+        # на второй запрос пользователь берется из кэша,
+        # а ответ - из кэша ответов: запросов к БД нет
+        with django_assert_num_queries(0):
+            response = admin_client.get(url)
+        assert response.status_code == 200
+
+    def test_role_change_invalidates(self, admin, admin_client):
+        assert admin_client.get(self.url).status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert admin_client.get(self.url).status_code == 403, (
+            'Проверьте, что после смены роли права проверяются по новой роли'
+        )
+
+    def test_deleted_user(self, admin, admin_client):
+        assert admin_client.get(self.url).status_code == 200
+        admin.delete()
+        assert admin_client.get(self.url).status_code == 401
+
+    def test_change_in_other_process(self, admin, admin_client, settings):
+        from api.authentication import UserSnapshotCache
+
+        settings.AUTH_USER_CACHE_ALIAS = 'default'
+        settings.AUTH_USER_CACHE_CHECK_INTERVAL = 0
+        assert admin_client.get(self.url).status_code == 200
+        # пользователя заблокировали в другом процессе:
+        # у того процесса свой LRU, общий только кэш
+        type(admin).objects.filter(pk=admin.pk).update(is_active=False)
+        UserSnapshotCache().delete(admin.pk)
+        assert admin_client.get(self.url).status_code == 401, (
+            'Проверьте, что снимок пользователя сбрасывается '
+            'во всех процессах'
+        )
+
+    def test_own_profile(self, admin_client):
+        response = admin_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['email'] == 'testadmin@yamdb.fake'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRoleClaims:
+
+    @pytest.fixture
+    def role_client(self, settings):
+        from rest_framework.test import APIClient
+
+        settings.JWT_ROLE_CLAIMS = True
+
+        def make_client(user):
+            from api.tokens import get_refresh_token
+
+            client = APIClient()
+            token = get_refresh_token(user).access_token
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            return client
+        return make_client
+
+    def test_no_user_query(self, admin, role_client,
+                           django_assert_num_queries):
+        from api.authentication import user_cache
+
+        client = role_client(admin)
+        client.get('/api/v1/genres/')
+        user_cache.clear()
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/genres/')
+        assert response.status_code == 200
+
+    def test_role_change_rejects_token(self, admin, role_client):
+        client = role_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что токен, выданный до смены роли, не принимается'
+        )
+        assert role_client(admin).get('/api/v1/users/').status_code == 403
+
+    def test_role_change_in_other_process(self, admin, role_client,
+                                          settings, monkeypatch):
+        import time
+
+        from django.core.cache import caches
+        from django.db.models import F
+
+        client = role_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        # изменение прав мимо сигналов этого процесса
+        type(admin).objects.filter(pk=admin.pk).update(
+            role_version=F('role_version') + 1
+        )
+        now = time.time()
+        monkeypatch.setattr(
+            'django.core.cache.backends.locmem.time.time',
+            lambda: now + settings.JWT_ROLE_VERSION_TIMEOUT + 1,
+        )
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что версия прав кэшируется на ограниченное время'
+        )
+        monkeypatch.undo()
+        caches['default'].clear()
+        assert client.get('/api/v1/users/').status_code == 401
+
+    def test_author_can_edit(self, catalogue, role_client):
+        review = catalogue['review']
+        client = role_client(review.author)
+        response = client.patch(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/',
+            data={'text': 'Новый текст'}
+        )
+        assert response.status_code == 200
+        assert response.json()['author'] == review.author.username
+
+    def test_author_can_create(self, catalogue, role_client):
+        review = catalogue['review']
+        client = role_client(review.author)
+        response = client.post(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/',
+            data={'text': 'Комментарий'}
+        )
+        assert response.status_code == 201
+        assert response.json()['author'] == review.author.username
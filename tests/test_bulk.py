@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBulk:
+
+    def send(self, client, method, url, items):
+        return getattr(client, method)(
+            url, data=json.dumps(items), content_type='application/json'
+        )
+
+    def test_titles(self, admin_client, catalogue,
+                    django_assert_max_num_queries):
+        from django.db import connection
+        from reviews.models import Title
+
+        url = '/api/v1/titles/bulk/'
+        items = [
+            {
+                'name': f'Новое {i}', 'year': 2000, 'description': 'Текст',
+                'genre': ['genre-1', 'genre-2'], 'category': 'category-3',
+            }
+            for i in range(50)
+        ]
+        if connection.features.can_return_ids_from_bulk_insert:
+            # аутентификация, проверка слагов и запись не зависят
+            # от количества объектов
+            with django_assert_max_num_queries(10):
+                response = self.send(admin_client, 'post', url, items)
+        else:
+            response = self.send(admin_client, 'post', url, items)
+        assert response.status_code == 201
+        results = response.json()['results']
+        assert [item['status'] for item in results] == ['created'] * 50
+        title = Title.objects.get(pk=results[0]['id'])
+        assert title.category.slug == 'category-3'
+        assert sorted(title.genre.values_list('slug', flat=True)) == [
+            'genre-1', 'genre-2'
+        ]
+
+        ids = [item['id'] for item in results]
+        response = self.send(admin_client, 'patch', url, [
+            {'id': ids[0], 'year': 1999, 'genre': ['genre-5']},
+            {'id': ids[1], 'category': 'category-4'},
+        ])
+        assert response.status_code == 200
+        assert Title.objects.get(pk=ids[0]).year == 1999
+        assert list(
+            Title.objects.get(pk=ids[0]).genre.values_list('slug', flat=True)
+        ) == ['genre-5']
+        assert Title.objects.get(pk=ids[1]).category.slug == 'category-4'
+
+        response = self.send(admin_client, 'delete', url, ids)
+        assert response.status_code == 200
+        assert not Title.objects.filter(pk__in=ids).exists()
+
+    def test_titles_invalid(self, admin_client, catalogue):
+        from reviews.models import Title
+
+        count = Title.objects.count()
+        response = self.send(admin_client, 'post', '/api/v1/titles/bulk/', [
+            {'name': 'Хорошее', 'year': 2000, 'description': 'Текст',
+             'genre': ['genre-1'], 'category': 'category-1'},
+            {'name': 'Плохое', 'year': 2000, 'description': 'Текст',
+             'genre': ['no-such-genre'], 'category': 'no-such-category'},
+            {'name': 'Без года'},
+        ])
+        assert response.status_code == 400
+        results = response.json()['results']
+        assert [item['index'] for item in results] == [1, 2]
+        assert set(results[0]['errors']) == {'genre', 'category'}
+        assert 'year' in results[1]['errors']
+        assert Title.objects.count() == count, (
+            'Проверьте, что при ошибке в одном объекте ничего не записывается'
+        )
+
+    def test_genres_and_categories(self, admin_client):
+        from reviews.models import Category, Genre
+
+        for model, url in ((Genre, '/api/v1/genres/bulk/'),
+                           (Category, '/api/v1/categories/bulk/')):
+            response = self.send(admin_client, 'post', url, [
+                {'name': 'Первый', 'slug': 'first'},
+                {'name': 'Второй', 'slug': 'second'},
+            ])
+            assert response.status_code == 201
+            assert model.objects.count() == 2
+
+            response = self.send(admin_client, 'post', url, [
+                {'name': 'Повтор', 'slug': 'first'},
+            ])
+            assert response.status_code == 400
+
+            response = self.send(admin_client, 'patch', url, [
+                {'slug': 'first', 'name': 'Новое название'},
+            ])
+            assert response.status_code == 200
+            assert model.objects.get(slug='first').name == 'Новое название'
+
+            response = self.send(
+                admin_client, 'delete', url, ['first', 'missing']
+            )
+            assert response.status_code == 400
+            response = self.send(admin_client, 'delete', url, ['first'])
+            assert response.status_code == 200
+            assert list(model.objects.values_list('slug', flat=True)) == [
+                'second'
+            ]
+
+    def test_limits_and_permissions(self, client, admin_client, settings):
+        url = '/api/v1/genres/bulk/'
+        item = {'name': 'Жанр', 'slug': 'genre'}
+        assert self.send(client, 'post', url, [item]).status_code == 401
+        settings.API_BULK_MAX_ITEMS = 1
+        response = self.send(admin_client, 'post', url, [item, item])
+        assert response.status_code == 400
+        assert self.send(admin_client, 'post', url, []).status_code == 400
@@ -0,0 +1,104 @@
+import pytest
+
+
+def get_code(email):
+    """Отправляет очередь писем и берет код из последнего письма."""
+    from api.outbox import send_pending
+    from django.core import mail
+
+    send_pending(batch_size=100)
+    message = [
+        message for message in mail.outbox if message.to == [email]
+    ][-1]
+    return message.body.split()[-1]
+
+
+@pytest.mark.django_db
+class TestConfirmationCode:
+    signup_url = '/api/v1/auth/signup/'
+    token_url = '/api/v1/auth/token/'
+    data = {'username': 'newuser', 'email': 'newuser@yamdb.fake'}
+
+    def test_code_is_single_use(self, client):
+        response = client.post(self.signup_url, data=self.data)
+        assert response.status_code == 200
+        code = get_code(self.data['email'])
+
+        token_data = {'username': 'newuser', 'confirmation_code': code}
+        response = client.post(self.token_url, data=token_data)
+        assert response.status_code == 200
+        assert 'access' in response.json()
+
+        response = client.post(self.token_url, data=token_data)
+        assert response.status_code == 400, (
+            'Проверьте, что код подтверждения нельзя использовать повторно'
+        )
+
+    def test_wrong_code(self, client):
+        client.post(self.signup_url, data=self.data)
+        code = get_code(self.data['email'])
+
+        for wrong_code in ('', '123456', code[:-1] + 'x', 'a-b-c'):
+            response = client.post(self.token_url, data={
+                'username': 'newuser', 'confirmation_code': wrong_code
+            })
+            assert response.status_code == 400
+
+    def test_expired_code(self, client, settings):
+        client.post(self.signup_url, data=self.data)
+        code = get_code(self.data['email'])
+
+        settings.CONFIRMATION_CODE_TIMEOUT = -1
+        response = client.post(self.token_url, data={
+            'username': 'newuser', 'confirmation_code': code
+        })
+        assert response.status_code == 400
+
+    def test_code_reissue(self, client, django_user_model):
+        from api.models import OutboxEmail
+
+        client.post(self.signup_url, data=self.data)
+        response = client.post(self.signup_url, data=self.data)
+        assert response.status_code == 200, (
+            'Проверьте, что повторный запрос кода для существующего '
+            'пользователя возвращает статус 200'
+        )
+        assert django_user_model.objects.count() == 1
+        assert OutboxEmail.objects.count() == 1, (
+            'Проверьте, что пока письмо с кодом не отправлено, '
+            'новое в очередь не ставится'
+        )
+
+        get_code(self.data['email'])
+        client.post(self.signup_url, data=self.data)
+        assert OutboxEmail.objects.count() == 2
+
+        response = client.post(self.token_url, data={
+            'username': 'newuser',
+            'confirmation_code': get_code(self.data['email'])
+        })
+        assert response.status_code == 200
+
+    def test_code_is_not_stored(self, client):
+        from api.models import OutboxEmail
+
+        client.post(self.signup_url, data=self.data)
+        code = get_code(self.data['email'])
+        assert not OutboxEmail.objects.filter(body__contains=code).exists(), (
+            'Проверьте, что код подтверждения не хранится в очереди писем'
+        )
+        assert OutboxEmail.objects.get().user.username == 'newuser'
+
+    def test_throttling(self, client, monkeypatch):
+        from rest_framework.throttling import ScopedRateThrottle
+
+        monkeypatch.setattr(
+            ScopedRateThrottle, 'THROTTLE_RATES', {'signup': '2/hour'}
+        )
+        for _ in range(2):
+            response = client.post(self.signup_url, data=self.data)
+            assert response.status_code == 200
+        response = client.post(self.signup_url, data=self.data)
+        assert response.status_code == 429, (
+            'Проверьте, что число запросов кода подтверждения ограничено'
+        )
@@ -0,0 +1,96 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestValuesList:
+
+    @pytest.fixture
+    def mixed(self, catalogue):
+        from reviews.models import Title
+
+        # произведение без категории и жанров и дробная средняя оценка
+        title = Title.objects.exclude(pk=catalogue['title'].pk).first()
+        title.genre.clear()
+        Title.objects.filter(pk=title.pk).update(
+            category=None, rating_sum=11, rating_count=2
+        )
+        return catalogue
+
+    def get(self, client, url, settings, values_list):
+        from django.core.cache import caches
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        settings.API_VALUES_LIST = values_list
+        caches['default'].clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return response.content, len(context.captured_queries)
+
+    def assert_same(self, client, url, settings):
+        expected, expected_queries = self.get(client, url, settings, False)
+        content, queries = self.get(client, url, settings, True)
+        assert content == expected, (
+            f'Проверьте, что {url} отдает тот же JSON, что и ModelSerializer'
+        )
+        assert queries <= expected_queries
+        return content
+
+    @pytest.mark.parametrize('query', [
+        '',
+        '?year=2003',
+        '?genre=genre-1',
+        '?fields=id,genre',
+        '?fields=rating,category',
+        '?omit=genre',
+    ])
+    def test_titles(self, client, mixed, settings, query):
+        self.assert_same(client, f'/api/v1/titles/{query}', settings)
+
+    @pytest.mark.parametrize('query', [
+        '',
+        '?limit=3&offset=2',
+        '?pagination=cursor',
+        '?fields=author,pub_date',
+        '?pagination=cursor&omit=author',
+    ])
+    def test_reviews_and_comments(self, client, mixed, settings, query):
+        review = mixed['review']
+        title_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        self.assert_same(client, f'{title_url}{query}', settings)
+        self.assert_same(
+            client, f'{title_url}{review.id}/comments/{query}', settings
+        )
+
+    def test_cursor_next_page(self, client, mixed, settings,
+                              django_user_model):
+        import json
+
+        from reviews.models import Review
+
+        review = mixed['review']
+        for i in range(5):
+            Review.objects.create(
+                title_id=review.title_id, text='Отзыв', score=7,
+                author=django_user_model.objects.create_user(
+                    username=f'reader{i}', email=f'reader{i}@yamdb.fake'
+                ),
+            )
+        url = f'/api/v1/titles/{review.title_id}/reviews/?pagination=cursor'
+        content = self.assert_same(client, url, settings)
+        next_url = json.loads(content)['next']
+        assert next_url
+        self.assert_same(client, next_url, settings)
+
+    def test_serializer(self, mixed):
+        from api.fast_serializers import TitleValuesSerializer
+        from api.serializers import TitleBaseSerializer
+        from reviews.models import Title
+
+        queryset = Title.objects.order_by('pk')
+        expected = TitleBaseSerializer(queryset, many=True).data
+        serializer = TitleValuesSerializer()
+        assert serializer.to_representation(
+            serializer.get_values(queryset)
+        ) == expected
@@ -0,0 +1,64 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestFieldSelection:
+
+    def get_items(self, client, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return response.json()['results'], context.captured_queries
+
+    def test_title_fields(self, client, catalogue):
+        items, queries = self.get_items(
+            client, '/api/v1/titles/?fields=id,name,rating'
+        )
+        assert set(items[0]) == {'id', 'name', 'rating'}
+        assert len(queries) == 2, (
+            'Проверьте, что без вложенных полей жанры не подгружаются'
+        )
+        assert 'description' not in queries[-1]['sql']
+        assert 'reviews_category' not in queries[-1]['sql']
+
+    def test_title_omit(self, client, catalogue):
+        items, queries = self.get_items(
+            client, '/api/v1/titles/?omit=description,genre'
+        )
+        assert set(items[0]) == {'id', 'name', 'year', 'rating', 'category'}
+        assert items[0]['category']['slug'].startswith('category-')
+        assert len(queries) == 2
+
+    def test_all_fields_by_default(self, client, catalogue):
+        items, queries = self.get_items(client, '/api/v1/titles/')
+        assert set(items[0]) == {
+            'id', 'name', 'year', 'rating', 'description', 'genre',
+            'category',
+        }
+        assert len(items[0]['genre']) == 2
+
+    def test_review_fields(self, client, catalogue):
+        title = catalogue['title']
+        url = f'/api/v1/titles/{title.id}/reviews/?pagination=cursor'
+        items, queries = self.get_items(client, f'{url}&fields=id,score')
+        assert set(items[0]) == {'id', 'score'}
+        assert 'reviews_user' not in queries[-1]['sql']
+
+        items, _ = self.get_items(client, f'{url}&omit=text')
+        assert set(items[0]) == {'id', 'author', 'title', 'score', 'pub_date'}
+
+    def test_comment_fields(self, client, catalogue):
+        review = catalogue['review']
+        items, _ = self.get_items(
+            client,
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+            f'?fields=author,text'
+        )
+        assert set(items[0]) == {'author', 'text'}
+
+    def test_unknown_field(self, client, catalogue):
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == 400
@@ -0,0 +1,140 @@
+import pytest
+
+from .fixtures.fixture_data import CSV_DATA
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImporter:
+
+    def load(self, csv_data, *args, workers=1):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command(
+            'fill_test_db', '--data-dir', str(csv_data),
+            '--workers', str(workers), *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def assert_loaded(self):
+        from django.contrib.auth import get_user_model
+        from reviews.models import Category, Comment, Genre, Review, Title
+        from reviews.ratings import rebuild_ratings
+
+        counts = {
+            'category': Category, 'genre': Genre,
+            'users': get_user_model(), 'titles': Title,
+            'genre_title': Title.genre.through,
+            'review': Review, 'comments': Comment,
+        }
+        for table, model in counts.items():
+            expected = len(CSV_DATA[table]) - 1
+            if table == 'review':
+                expected -= 1
+            assert model.objects.count() == expected, (
+                f'Проверьте, что таблица {table} загружена целиком'
+            )
+        ratings = {1: (18, 2), 2: (7, 2), 3: (7, 1), 4: (0, 0)}
+        assert self.get_ratings() == ratings
+        rebuild_ratings()
+        assert self.get_ratings() == ratings
+
+    def get_ratings(self):
+        from reviews.models import Title
+
+        return {
+            pk: (rating_sum, rating_count)
+            for pk, rating_sum, rating_count in Title.objects.values_list(
+                'pk', 'rating_sum', 'rating_count'
+            )
+        }
+
+    def test_load(self, csv_data):
+        from reviews.models import Review, Title
+
+        output = self.load(csv_data)
+        assert 'Successfully updated review: 5 rows, 1 skipped' in output
+        self.assert_loaded()
+        assert Title.objects.get(pk=4).category is None
+        assert list(
+            Title.objects.get(pk=2).genre.values_list('slug', flat=True)
+            .order_by('slug')
+        ) == ['comedy', 'drama']
+
+        # повторный запуск обновляет строки, а не дублирует их
+        (csv_data / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '1,1,Исправлено,100,10,2019-09-24T21:08:21Z\n',
+            encoding='utf-8',
+        )
+        self.load(csv_data)
+        self.assert_loaded()
+        assert Review.objects.get(pk=1).text == 'Исправлено'
+
+        # счетчики id сдвинуты за загруженные строки
+        title = Title.objects.create(name='Новое', year=2020, description='')
+        assert title.pk > 4
+
+    def test_load_parallel(self, csv_data):
+        import re
+
+        from django.db import connection
+
+        if connection.vendor != 'postgresql':
+            pytest.skip('SQLite грузит таблицы в одном процессе')
+        output = self.load(csv_data, workers=2)
+        # строки со ссылками на еще не загруженные таблицы были бы
+        # пропущены, поэтому полная загрузка проверяет и порядок
+        self.assert_loaded()
+        order = re.findall(r'Successfully updated (\w+)', output)
+        assert sorted(order) == sorted(CSV_DATA)
+        parents = {
+            'titles': ['category'],
+            'genre_title': ['titles', 'genre'],
+            'review': ['titles', 'users'],
+            'comments': ['review', 'users'],
+        }
+        for table, tables in parents.items():
+            for parent in tables:
+                assert order.index(parent) < order.index(table), (
+                    f'Проверьте, что {table} грузится после {parent}'
+                )
+
+    def get_constraints(self):
+        from django.db import connection
+        from reviews.models import Review
+
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Review._meta.db_table
+            )
+        return {
+            name for name, constraint in constraints.items()
+            if constraint['foreign_key'] or constraint['index']
+        }
+
+    def test_drop_indexes(self, csv_data, monkeypatch):
+        from django.db import connection
+
+        if connection.vendor != 'postgresql':
+            pytest.skip('индексы удаляются только в PostgreSQL')
+        constraints = self.get_constraints()
+        self.load(csv_data, '--drop-indexes')
+        self.assert_loaded()
+        assert self.get_constraints() == constraints
+
+        def fail(*args, **kwargs):
+            # на время загрузки часть индексов и ключей удалена
+            assert self.get_constraints() < constraints
+            raise RuntimeError('Ошибка загрузки')
+
+        monkeypatch.setattr(
+            'reviews.management.commands.fill_test_db.load_table', fail
+        )
+        with pytest.raises(RuntimeError):
+            self.load(csv_data, '--drop-indexes')
+        assert self.get_constraints() == constraints, (
+            'Проверьте, что индексы восстанавливаются после ошибки загрузки'
+        )
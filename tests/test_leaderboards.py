@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLeaderboards:
+
+    @pytest.fixture
+    def ranked(self, catalogue, django_user_model):
+        from django.utils import timezone
+        from reviews.models import Review, Title
+
+        # у первого произведения 10 отзывов с оценкой 5,
+        # у второго - два отзыва с оценкой 9, один из них старый
+        second = Title.objects.exclude(pk=catalogue['title'].pk).first()
+        for i in range(2):
+            author = django_user_model.objects.create_user(
+                username=f'critic{i}', email=f'critic{i}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                title=second, author=author, score=9
+            )
+        Review.objects.filter(pk=review.pk).update(
+            pub_date=timezone.now() - timedelta(days=20)
+        )
+        return catalogue['title'], second
+
+    def get_board(self, client, url):
+        from reviews.rankings import refresh_rankings
+
+        refresh_rankings()
+        response = client.get(url)
+        assert response.status_code == 200
+        return [
+            (item['position'], item['title']['id'], item['review_count'])
+            for item in response.json()['results']
+        ]
+
+    def test_top(self, client, ranked):
+        first, second = ranked
+        assert self.get_board(client, '/api/v1/leaderboards/top/') == [
+            (1, second.id, 2), (2, first.id, 10),
+        ]
+
+    def test_trending(self, client, ranked):
+        first, second = ranked
+        week = self.get_board(client, '/api/v1/leaderboards/trending-week/')
+        assert week == [(1, first.id, 10), (2, second.id, 1)]
+        month = self.get_board(
+            client, '/api/v1/leaderboards/trending-month/'
+        )
+        assert month == [(1, first.id, 10), (2, second.id, 2)]
+
+    def test_scopes(self, client, ranked):
+        first, second = ranked
+        url = '/api/v1/leaderboards/top/'
+        assert self.get_board(
+            client, f'{url}?category={first.category.slug}'
+        ) == [(1, first.id, 10)]
+        assert self.get_board(client, f'{url}?genre=genre-0') == [
+            (1, second.id, 2), (2, first.id, 10),
+        ]
+        assert self.get_board(client, f'{url}?genre=genre-5') == []
+        response = client.get(f'{url}?genre=genre-0&category=category-0')
+        assert response.status_code == 400
+
+    def test_refresh_invalidates(self, client, ranked,
+                                 django_assert_num_queries):
+        from reviews.models import Review
+
+        first, second = ranked
+        url = '/api/v1/leaderboards/top/'
+        assert len(self.get_board(client, url)) == 2
+        with django_assert_num_queries(0):
+            client.get(url)
+        Review.objects.filter(title=second).delete()
+        assert self.get_board(client, url) == [(1, first.id, 10)], (
+            'Проверьте, что после пересчета рейтинга отдаются новые места'
+        )
@@ -0,0 +1,89 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_bulk_created_users_share_connection(self, admin_client,
+                                                 smtp_server, settings):
+        from api.models import SENT_STATUS, OutboxEmail
+        from api.outbox import send_pending
+
+        settings.EMAIL_SEND_BATCH_SIZE = 2
+        for i in range(5):
+            response = admin_client.post('/api/v1/users/', data={
+                'username': f'newuser{i}', 'email': f'newuser{i}@yamdb.fake'
+            })
+            assert response.status_code == 201
+        assert OutboxEmail.objects.count() == 5, (
+            'Проверьте, что письмо с кодом для созданного админом '
+            'пользователя ставится в очередь'
+        )
+
+        stats = send_pending(batch_size=100)
+
+        assert (stats.sent, stats.failed) == (5, 0)
+        assert stats.batches == 3
+        assert smtp_server.connections == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение'
+        )
+        assert len(smtp_server.messages) == 5
+        assert not OutboxEmail.objects.exclude(status=SENT_STATUS).exists()
+
+    def test_unavailable_server_schedules_retry(self, smtp_server, settings):
+        from api.models import PENDING_STATUS, OutboxEmail
+        from api.outbox import enqueue_email, send_pending
+
+        enqueue_email('Тема', 'Текст', 'user@yamdb.fake')
+        smtp_server.shutdown()
+        smtp_server.server_close()
+
+        stats = send_pending(batch_size=100)
+
+        assert (stats.sent, stats.failed) == (0, 1)
+        email = OutboxEmail.objects.get()
+        assert email.status == PENDING_STATUS
+        assert email.attempts == 1
+        assert email.last_error
+
+    def test_failure_in_batch_retries_only_unsent(self, smtp_server,
+                                                  settings):
+        from api.models import PENDING_STATUS, SENT_STATUS, OutboxEmail
+        from api.outbox import enqueue_email, send_pending
+
+        settings.EMAIL_SEND_BATCH_SIZE = 3
+        for name in ('first', 'broken', 'last'):
+            enqueue_email('Тема', 'Текст', f'{name}@yamdb.fake')
+        smtp_server.rejected.add('broken@yamdb.fake')
+
+        stats = send_pending(batch_size=100)
+
+        assert (stats.sent, stats.failed) == (2, 1)
+        assert len(smtp_server.messages) == 2
+        broken = OutboxEmail.objects.get(to_email='broken@yamdb.fake')
+        assert broken.status == PENDING_STATUS
+        assert OutboxEmail.objects.filter(status=SENT_STATUS).count() == 2
+
+        smtp_server.rejected.clear()
+        OutboxEmail.objects.filter(pk=broken.pk).update(
+            next_attempt_at=broken.created
+        )
+        stats = send_pending(batch_size=100)
+        assert (stats.sent, stats.failed) == (1, 0)
+        assert [recipients for recipients, _ in smtp_server.messages] == [
+            ['<first@yamdb.fake>'], ['<last@yamdb.fake>'],
+            ['<broken@yamdb.fake>'],
+        ], 'Проверьте, что отправленные письма не отправляются повторно'
+
+    def test_claimed_emails_are_skipped(self, smtp_server):
+        from api.models import OutboxEmail
+        from api.outbox import claim_pending, enqueue_email, send_pending
+
+        enqueue_email('Тема', 'Текст', 'user@yamdb.fake')
+        claimed = claim_pending(batch_size=100)
+        assert len(claimed) == 1
+        assert send_pending(batch_size=100).sent == 0, (
+            'Проверьте, что забранное другим обработчиком письмо '
+            'не отправляется второй раз'
+        )
+        assert OutboxEmail.objects.get().attempts == 1
@@ -0,0 +1,85 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    @pytest.fixture
+    def feed(self, catalogue, django_user_model):
+        """
+        25 отзывов на произведение; у 12 из них одна дата публикации,
+        и они попадают на границу страниц.
+        """
+        from datetime import timedelta
+
+        from django.utils import timezone
+        from reviews.models import Review
+
+        title = catalogue['title']
+        for i in range(15):
+            Review.objects.create(
+                title=title, text='Отзыв', score=7,
+                author=django_user_model.objects.create_user(
+                    username=f'reader{i}', email=f'reader{i}@yamdb.fake'
+                ),
+            )
+        reviews = list(
+            Review.objects.filter(title=title).order_by('id')
+        )
+        moment = timezone.now() - timedelta(days=1)
+        for i, review in enumerate(reviews):
+            # первые 12 отзывов с одной датой, остальные позже
+            pub_date = moment + timedelta(seconds=max(i - 11, 0))
+            Review.objects.filter(pk=review.pk).update(pub_date=pub_date)
+        return title
+
+    def walk(self, client, url, link):
+        ids = []
+        pages = 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            ids.extend(item['id'] for item in data['results'])
+            url = data[link]
+            pages += 1
+        return ids, pages
+
+    def test_next_and_previous(self, client, feed):
+        from reviews.models import Review
+
+        expected = list(
+            Review.objects.filter(title=feed).order_by(
+                '-pub_date', '-id'
+            ).values_list('id', flat=True)
+        )
+        assert len(expected) == 25
+        url = f'/api/v1/titles/{feed.pk}/reviews/?pagination=cursor'
+        ids, pages = self.walk(client, url, 'next')
+        assert len(ids) == len(set(ids)), (
+            'Проверьте, что при переходе по next записи не повторяются'
+        )
+        assert ids == expected, (
+            'Проверьте, что при переходе по next записи не теряются'
+        )
+        assert pages == 3
+
+        # обратно по previous с последней страницы
+        last_page = client.get(url)
+        for _ in range(2):
+            last_page = client.get(last_page.json()['next'])
+        previous = last_page.json()['previous']
+        ids, _ = self.walk(client, previous, 'previous')
+        assert ids == expected[10:20] + expected[:10], (
+            'Проверьте, что при переходе по previous записи '
+            'не теряются и не повторяются'
+        )
+
+    def test_invalid_cursor(self, client, feed):
+        from base64 import b64encode
+
+        cursor = b64encode(b'p=not-a-date').decode()
+        response = client.get(
+            f'/api/v1/titles/{feed.pk}/reviews/?cursor={cursor}'
+        )
+        assert response.status_code == 404
@@ -0,0 +1,204 @@
+import pytest
+
+# Максимальное количество запросов к БД на одну страницу.
+# Бюджет не должен зависеть от размера страницы.
+QUERY_BUDGET = {
+    'titles': 3,
+    'title_detail': 2,
+    'titles_cached': 0,
+    'not_modified': 0,
+    'reviews': 2,
+    'comments': 2,
+    'genres': 2,
+    'categories': 2,
+    'users': 3,
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryBudget:
+
+    def check_budget(self, client, url, budget_name,
+                     django_assert_max_num_queries):
+        budget = QUERY_BUDGET[budget_name]
+        with django_assert_max_num_queries(budget):
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+        )
+
+    def test_titles(self, client, catalogue, django_assert_max_num_queries):
+        self.check_budget(client, '/api/v1/titles/', 'titles',
+                          django_assert_max_num_queries)
+        self.check_budget(client, f'/api/v1/titles/{catalogue["title"].id}/',
+                          'title_detail', django_assert_max_num_queries)
+
+    def test_titles_cached(self, client, catalogue,
+                           django_assert_max_num_queries):
+        client.get('/api/v1/titles/')
+        self.check_budget(client, '/api/v1/titles/', 'titles_cached',
+                          django_assert_max_num_queries)
+        url = f'/api/v1/titles/{catalogue["title"].id}/'
+        client.get(url)
+        catalogue['title'].genre.clear()
+        response = client.get(url)
+        assert response.json()['genre'] == [], (
+            'Проверьте, что после изменения произведения '
+            'не выдается устаревший ответ из кэша'
+        )
+
+    def test_cached_links_follow_host(self, client, catalogue):
+        url = '/api/v1/genres/?limit=1'
+        for scheme, host in (
+            ('http', 'yamdb.fake'), ('https', 'yamdb.fake'),
+            ('http', 'mirror.yamdb.fake'),
+        ):
+            response = client.get(
+                url, HTTP_HOST=host, secure=scheme == 'https'
+            )
+            assert response.json()['next'].startswith(
+                f'{scheme}://{host}/'
+            ), (
+                'Проверьте, что ссылки next/previous из кэша '
+                'указывают на хост и схему текущего запроса'
+            )
+
+    def test_not_modified(self, client, catalogue,
+                          django_assert_max_num_queries):
+        url = f'/api/v1/titles/{catalogue["title"].id}/reviews/'
+        etag = client.get(url)['ETag']
+        with django_assert_max_num_queries(QUERY_BUDGET['not_modified']):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным ETag '
+            'возвращает статус 304'
+        )
+        catalogue['review'].delete()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после изменения отзывов ETag меняется'
+        )
+
+    def test_last_modified(self, client, catalogue, monkeypatch):
+        import time
+
+        from api.cache import bump_version
+        from django.utils.http import http_date, parse_http_date
+
+        url = f'/api/v1/titles/{catalogue["title"].id}/reviews/'
+        started = time.time()
+        # частые изменения уводят номер поколения вперед часов
+        for _ in range(5000):
+            bump_version('reviews', 'users')
+        now = started + 2
+        monkeypatch.setattr(time, 'time', lambda: now)
+        response = client.get(url)
+        assert response.has_header('Last-Modified'), (
+            'Проверьте, что Last-Modified не зависит от номера поколения'
+        )
+        modified = parse_http_date(response['Last-Modified'])
+        assert int(started) <= modified <= now
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(modified)
+        )
+        assert response.status_code == 304
+
+    def test_reviews(self, client, catalogue, django_assert_max_num_queries):
+        title_id = catalogue['title'].id
+        self.check_budget(client, f'/api/v1/titles/{title_id}/reviews/',
+                          'reviews', django_assert_max_num_queries)
+
+    def test_comments(self, client, catalogue, django_assert_max_num_queries):
+        title_id = catalogue['title'].id
+        review_id = catalogue['review'].id
+        self.check_budget(
+            client,
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            'comments', django_assert_max_num_queries
+        )
+
+    def test_genres(self, client, catalogue, django_assert_max_num_queries):
+        self.check_budget(client, '/api/v1/genres/', 'genres',
+                          django_assert_max_num_queries)
+
+    def test_categories(self, client, catalogue,
+                        django_assert_max_num_queries):
+        self.check_budget(client, '/api/v1/categories/', 'categories',
+                          django_assert_max_num_queries)
+
+    def test_users(self, admin_client, catalogue,
+                   django_assert_max_num_queries):
+        self.check_budget(admin_client, '/api/v1/users/', 'users',
+                          django_assert_max_num_queries)
+
+    @pytest.mark.parametrize('values_list', [True, False])
+    def test_query_count_header(self, client, catalogue, settings,
+                                values_list):
+        settings.API_QUERY_COUNT_HEADER = True
+        settings.API_VALUES_LIST = values_list
+        title_id = catalogue['title'].id
+        review_id = catalogue['review'].id
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        for url, budget_name in (
+            (url, 'reviews'),
+            (f'{url}?pagination=cursor', 'reviews'),
+            (f'{url}{review_id}/comments/', 'comments'),
+        ):
+            response = client.get(url)
+            assert response.status_code == 200
+            assert int(response['X-DB-Query-Count']) <= (
+                QUERY_BUDGET[budget_name]
+            ), f'Проверьте количество запросов к БД для `{url}`'
+
+    def test_review_author_columns(self, client, catalogue, settings):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        settings.API_QUERY_COUNT_HEADER = True
+        review = catalogue['review']
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.json()['author'] == review.author.username
+        assert response['X-DB-Query-Count'] == str(
+            len(context.captured_queries)
+        )
+        sql = context.captured_queries[-1]['sql']
+        assert 'reviews_user' in sql and 'password' not in sql, (
+            'Проверьте, что из автора отзыва загружается только username'
+        )
+
+    def test_query_count_header_disabled(self, client, catalogue, settings):
+        settings.API_QUERY_COUNT_HEADER = False
+        response = client.get('/api/v1/titles/')
+        assert 'X-DB-Query-Count' not in response
+
+    def test_fast_delete(self, client, admin_client, catalogue):
+        from django.db.models.signals import post_delete
+        from reviews.models import Comment, Title, TitleRanking
+
+        # без обработчиков Collector удаляет строки одним запросом
+        for model in (Comment, Title.genre.through, TitleRanking):
+            assert not post_delete.has_listeners(model), (
+                f'Проверьте, что у {model.__name__} нет обработчиков '
+                'post_delete'
+            )
+
+        review = catalogue['review']
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        comments = client.get(url).json()['results']
+        assert len(comments) == 10
+        response = admin_client.delete(f'{url}{comments[0]["id"]}/')
+        assert response.status_code == 204
+        assert len(client.get(url).json()['results']) == 9, (
+            'Проверьте, что после удаления комментария '
+            'не выдается устаревший ответ из кэша'
+        )
+
+        # комментарии удаляются каскадом вместе с автором
+        author = Comment.objects.filter(review=review).first().author
+        author.delete()
+        assert len(client.get(url).json()['results']) == 8, (
+            'Проверьте, что после удаления автора '
+            'не выдается устаревший ответ из кэша'
+        )
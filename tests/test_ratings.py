@@ -0,0 +1,181 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestRatingCounters:
+
+    @pytest.fixture
+    def titles(self, catalogue):
+        from reviews.models import Title
+
+        return list(Title.objects.exclude(pk=catalogue['title'].pk)[:2])
+
+    def get_ratings(self, *titles):
+        from reviews.models import Title
+
+        return [
+            Title.objects.values_list('rating_sum', 'rating_count')
+            .get(pk=title.pk)
+            for title in titles
+        ]
+
+    def assert_rebuilt(self):
+        """rebuild_ratings не должен менять поддерживаемые счетчики."""
+        from reviews.models import Title
+        from reviews.ratings import rebuild_ratings
+
+        expected = list(Title.objects.order_by('pk').values_list(
+            'pk', 'rating_sum', 'rating_count'
+        ))
+        rebuild_ratings()
+        assert list(Title.objects.order_by('pk').values_list(
+            'pk', 'rating_sum', 'rating_count'
+        )) == expected
+
+    def test_counters(self, titles, django_user_model):
+        from reviews.models import Review
+
+        first, second = titles
+        author = django_user_model.objects.create_user(
+            username='critic', email='critic@yamdb.fake'
+        )
+        other = django_user_model.objects.create_user(
+            username='reader', email='reader@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=first, author=author, text='Отзыв', score=8
+        )
+        Review.objects.create(title=first, author=other, text='Отзыв', score=3)
+        assert self.get_ratings(first, second) == [(11, 2), (0, 0)]
+        self.assert_rebuilt()
+
+        review.score = 6
+        review.save()
+        assert self.get_ratings(first, second) == [(9, 2), (0, 0)]
+        self.assert_rebuilt()
+
+        review.title = second
+        review.save()
+        assert self.get_ratings(first, second) == [(3, 1), (6, 1)]
+        self.assert_rebuilt()
+
+        review.delete()
+        assert self.get_ratings(first, second) == [(3, 1), (0, 0)]
+        Review.objects.filter(title=first).delete()
+        assert self.get_ratings(first, second) == [(0, 0), (0, 0)]
+        self.assert_rebuilt()
+
+    def test_partially_loaded_review(self, titles, django_user_model):
+        from reviews.models import Review
+
+        first, second = titles
+        author = django_user_model.objects.create_user(
+            username='critic', email='critic@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=first, author=author, text='Отзыв', score=8
+        )
+
+        # без title_id и score в выборке прежние значения
+        # берет из БД обработчик pre_save
+        partial = Review.objects.only('text').get(pk=review.pk)
+        assert not hasattr(partial, '_loaded_rating')
+        partial.score = 2
+        partial.save()
+        assert self.get_ratings(first) == [(2, 1)]
+
+        # отзыв, созданный вручную с pk существующей строки
+        Review(
+            pk=review.pk, title=second, author=author, text='Отзыв', score=4,
+            pub_date=review.pub_date,
+        ).save()
+        assert self.get_ratings(first, second) == [(0, 0), (4, 1)]
+        self.assert_rebuilt()
+
+    def test_rating(self, titles, django_user_model):
+        from reviews.models import Review, Title
+
+        first, _ = titles
+        assert Title.objects.get(pk=first.pk).rating is None
+        for score in (7, 8):
+            Review.objects.create(
+                title=first, text='Отзыв', score=score,
+                author=django_user_model.objects.create_user(
+                    username=f'critic{score}', email=f'{score}@yamdb.fake'
+                ),
+            )
+        assert Title.objects.get(pk=first.pk).rating == 7.5
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rebuild_command(self, client, catalogue):
+        from io import StringIO
+
+        from django.core.cache import caches
+        from django.core.management import call_command
+        from reviews.models import Title
+
+        title = catalogue['title']
+        url = f'/api/v1/titles/{title.pk}/'
+        # счетчики разошлись с отзывами, например после правки БД вручную
+        Title.objects.filter(pk=title.pk).update(rating_sum=1, rating_count=1)
+        caches['default'].clear()
+        assert client.get(url).json()['rating'] == 1
+
+        out = StringIO()
+        call_command('rebuild_ratings', stdout=out)
+        assert client.get(url).json()['rating'] == 5, (
+            'Проверьте, что после пересчета рейтинга кэш ответов сброшен'
+        )
+        # в тестах кэш в памяти процесса - команда предупреждает,
+        # что сервер в другом процессе об изменениях не узнает
+        assert 'Кэш API хранится в памяти процесса' in out.getvalue()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_concurrent_updates(self, admin, catalogue, monkeypatch):
+        import threading
+
+        from api.views import ReviewViewSet
+        from django.db import connection, connections
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        if connection.vendor != 'postgresql':
+            pytest.skip('нужны блокировки строк PostgreSQL')
+        review = catalogue['review']
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        # оба запроса загружают отзыв до того, как любой из них сохранит его
+        barrier = threading.Barrier(2, timeout=10)
+        get_object = ReviewViewSet.get_object
+
+        def get_object_together(view):
+            instance = get_object(view)
+            barrier.wait()
+            return instance
+
+        monkeypatch.setattr(ReviewViewSet, 'get_object', get_object_together)
+        token = RefreshToken.for_user(admin).access_token
+        responses = []
+
+        def patch(score):
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            try:
+                responses.append(client.patch(url, data={'score': score}))
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=patch, args=(score,)) for score in (1, 9)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert [response.status_code for response in responses] == [200, 200]
+        review.refresh_from_db()
+        assert review.score in (1, 9)
+        assert self.get_ratings(review.title) == [(45 + review.score, 10)], (
+            'Проверьте, что параллельные изменения оценки не искажают '
+            'рейтинг произведения'
+        )
+        self.assert_rebuilt()
@@ -0,0 +1,114 @@
+import io
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+DATA = {
+    'datetime': datetime(2022, 7, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    'naive': datetime(2022, 7, 1, 12, 30, 15),
+    'date': date(2022, 7, 1),
+    'time': time(12, 30, 15, 500000),
+    'timedelta': timedelta(hours=1, milliseconds=5),
+    'decimal': Decimal('10.50'),
+    'uuid': UUID('12345678-1234-5678-1234-567812345678'),
+    'text': 'Текст "в кавычках"\n\t  \x7f',
+    'numbers': [0, -1, 1.5, 5.0, True, None],
+    1: 'числовой ключ',
+    'nested': [{'tuple': (1, 2)}, {'set': frozenset()}],
+}
+
+
+class TestRenderers:
+
+    def render(self, renderer_class, data, accepted_media_type=None):
+        return renderer_class().render(data, accepted_media_type, {})
+
+    @pytest.mark.parametrize('data', [
+        DATA,
+        [DATA, DATA],
+        {'big': 2 ** 70},
+        {'floats': [1e-7, 1e-5, 1e-4, 0.1, 1e15, 1e16, -1e22, 0.0, -0.0]},
+        {'decimals': [Decimal('1e-7'), Decimal('1E+20'), Decimal('0')]},
+        [],
+        '',
+    ])
+    def test_same_output(self, data):
+        from api.renderers import FastJSONRenderer
+        from rest_framework.renderers import JSONRenderer
+
+        assert self.render(FastJSONRenderer, data) == self.render(
+            JSONRenderer, data
+        )
+
+    def test_indent(self):
+        from api.renderers import FastJSONRenderer
+        from rest_framework.renderers import JSONRenderer
+
+        media_type = 'application/json; indent=4'
+        rendered = self.render(FastJSONRenderer, DATA, media_type)
+        assert rendered == self.render(JSONRenderer, DATA, media_type)
+        assert b'\n    ' in rendered
+
+    def test_errors(self):
+        from api.renderers import FastJSONRenderer
+        from rest_framework.renderers import JSONRenderer
+
+        for value in (float('nan'), float('inf'), -float('inf')):
+            for renderer_class in (JSONRenderer, FastJSONRenderer):
+                with pytest.raises(ValueError):
+                    self.render(renderer_class, {'nested': [value]})
+
+        with pytest.raises(TypeError):
+            self.render(FastJSONRenderer, {'object': object()})
+        with pytest.raises(ValueError):
+            self.render(
+                FastJSONRenderer,
+                {'time': time(12, 30, tzinfo=timezone.utc)}
+            )
+
+    @pytest.mark.parametrize('content', [
+        '{"name": "Текст", "list": [1, 2.5, null, true]}',
+        '{"big": 123456789012345678901234567890}',
+        '"\\ud800"',
+    ])
+    def test_parse(self, content):
+        from api.renderers import FastJSONParser
+        from rest_framework.parsers import JSONParser
+
+        content = content.encode('utf-8')
+        assert FastJSONParser().parse(io.BytesIO(content)) == (
+            JSONParser().parse(io.BytesIO(content))
+        )
+
+    @pytest.mark.parametrize('content', [b'{"a": NaN}', b'{"a": ', b''])
+    def test_parse_errors(self, content):
+        from api.renderers import FastJSONParser
+        from rest_framework.exceptions import ParseError
+        from rest_framework.parsers import JSONParser
+
+        with pytest.raises(ParseError) as expected:
+            JSONParser().parse(io.BytesIO(content))
+        with pytest.raises(ParseError) as error:
+            FastJSONParser().parse(io.BytesIO(content))
+        assert str(error.value) == str(expected.value)
+
+    @pytest.mark.django_db
+    def test_api(self, client, admin_client, catalogue):
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/json'
+        assert len(response.json()['results']) == 10
+
+        response = admin_client.post(
+            '/api/v1/genres/',
+            data='{"name": "Жанр", "slug": "new-genre"}',
+            content_type='application/json',
+        )
+        assert response.status_code == 201
+        response = admin_client.post(
+            '/api/v1/genres/', data='{"name": ',
+            content_type='application/json',
+        )
+        assert response.status_code == 400
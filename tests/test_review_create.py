@@ -0,0 +1,81 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReviewCreate:
+
+    def post(self, client, title_id, score=7):
+        return client.post(
+            f'/api/v1/titles/{title_id}/reviews/',
+            data={'text': 'Отзыв', 'score': score},
+            format='json',
+        )
+
+    def test_create(self, admin_client, admin, catalogue):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Review, Title
+
+        title = Title.objects.exclude(pk=catalogue['title'].pk).first()
+        with CaptureQueriesContext(connection) as context:
+            response = self.post(admin_client, title.pk)
+        assert response.status_code == 201
+        assert response.json()['author'] == admin.username
+        assert response.json()['title'] == title.pk
+        statements = [
+            query['sql'].split()[0] for query in context.captured_queries
+        ]
+        assert statements.count('INSERT') == 1
+        assert not any(
+            'FROM "reviews_title"' in query['sql']
+            or 'FROM "reviews_review"' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что перед созданием отзыва нет проверочных запросов'
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (7, 1)
+        assert Review.objects.filter(title=title, author=admin).exists()
+
+    def test_duplicate(self, admin_client, catalogue):
+        from reviews.models import Review, Title
+
+        title = Title.objects.exclude(pk=catalogue['title'].pk).first()
+        assert self.post(admin_client, title.pk).status_code == 201
+        response = self.post(admin_client, title.pk, score=1)
+        assert response.status_code == 400
+        assert response.json() == {'message': 'Вы уже оставили отзыв'}
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (7, 1), (
+            'Проверьте, что повторный отзыв не меняет рейтинг'
+        )
+        assert Review.objects.filter(title=title).count() == 1
+
+    def test_other_integrity_error(self, admin_client, catalogue,
+                                   monkeypatch):
+        from django.db import IntegrityError
+        from reviews.models import Review, Title
+        from reviews.ratings import apply_rating_delta
+
+        def break_counter(title_id, score_delta, count_delta):
+            # rating_count не может быть отрицательным (CHECK в БД)
+            return apply_rating_delta(title_id, score_delta, -10 ** 6)
+
+        monkeypatch.setattr('api.views.apply_rating_delta', break_counter)
+        title = Title.objects.exclude(pk=catalogue['title'].pk).first()
+        with pytest.raises(IntegrityError):
+            self.post(admin_client, title.pk)
+        assert not Review.objects.filter(title=title).exists(), (
+            'Проверьте, что только повторный отзыв считается '
+            'ответом 400 "Вы уже оставили отзыв"'
+        )
+
+    def test_missing_title(self, admin_client, catalogue):
+        from reviews.models import Review
+
+        count = Review.objects.count()
+        response = self.post(admin_client, 10 ** 6)
+        assert response.status_code == 404
+        assert Review.objects.count() == count
+
+    def test_invalid(self, admin_client, catalogue):
+        title = catalogue['title']
+        assert self.post(admin_client, title.pk, score=11).status_code == 400
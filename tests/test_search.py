@@ -0,0 +1,62 @@
+import pytest
+
+URL = '/api/v1/titles/'
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Title
+
+        Title.objects.create(
+            name='Побег из Шоушенка', year=1994,
+            description='Банкир попадает в тюрьму'
+        )
+        Title.objects.create(
+            name='Крестный отец', year=1972,
+            description='Семейная сага о мафии'
+        )
+        Title.objects.create(
+            name='The Godfather Part II', year=1974,
+            description='Sequel about the Corleone family'
+        )
+
+    def search(self, client, value, **params):
+        response = client.get(URL, {'search': value, **params})
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    @pytest.fixture
+    def fallback(self, monkeypatch):
+        """Поиск как в БД без полнотекстового поиска."""
+        from django.db import connection
+
+        monkeypatch.setattr(connection, 'vendor', 'sqlite')
+
+    def test_fallback(self, client, titles, fallback):
+        assert self.search(client, 'Шоушенк') == ['Побег из Шоушенка']
+        assert self.search(client, 'godfather') == ['The Godfather Part II']
+        # описание тоже участвует в поиске
+        assert self.search(client, 'мафии') == ['Крестный отец']
+        assert self.search(client, 'Терминатор') == []
+        assert len(self.search(client, '  ')) == 3
+
+    def test_full_text(self, client, titles):
+        from django.db import connection
+
+        if connection.vendor != 'postgresql':
+            pytest.skip('полнотекстовый поиск есть только в PostgreSQL')
+        # формы слова находятся через словарь russian
+        assert self.search(client, 'побеги') == ['Побег из Шоушенка']
+        assert self.search(client, 'мафия') == ['Крестный отец']
+        assert self.search(client, 'families') == ['The Godfather Part II']
+        assert self.search(client, 'Терминатор') == []
+        # короткий запрос - по названию
+        assert self.search(client, 'отц') == []
+        assert self.search(client, 'оте') == ['Крестный отец']
+
+    def test_combined_with_filters(self, client, titles, fallback):
+        assert self.search(client, 'отец', year=1972) == ['Крестный отец']
+        assert self.search(client, 'отец', year=1994) == []
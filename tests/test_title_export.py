@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+URL = '/api/v1/titles/export/'
+
+
+@pytest.mark.django_db
+class TestTitleExport:
+
+    def make_client(self, user):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        client = APIClient()
+        token = RefreshToken.for_user(user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        return client
+
+    def read_lines(self, response):
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        content = b''.join(response.streaming_content)
+        assert not content or content.endswith(b'\n')
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_permissions(self, client, catalogue, django_user_model):
+        assert client.get(URL).status_code == 401
+        for role in ('user', 'moderator'):
+            user = django_user_model.objects.create_user(
+                username=role, email=f'{role}@yamdb.fake', role=role
+            )
+            response = self.make_client(user).get(URL)
+            assert response.status_code == 403, (
+                f'Проверьте, что выгрузка недоступна роли {role}'
+            )
+
+    def test_lines(self, client, admin_client, catalogue, monkeypatch):
+        from api.views import TitleViewSet
+        from reviews.models import Title
+
+        # несколько пачек, чтобы проверить подгрузку жанров к каждой
+        monkeypatch.setattr(TitleViewSet, 'export_chunk_size', 3)
+        titles = self.read_lines(admin_client.get(URL))
+        assert [title['id'] for title in titles] == list(
+            Title.objects.order_by('pk').values_list('pk', flat=True)
+        )
+        for title in titles:
+            detail = client.get(f'/api/v1/titles/{title["id"]}/').json()
+            assert title == detail, (
+                'Проверьте, что строка выгрузки совпадает с карточкой '
+                'произведения'
+            )
+        assert titles[0]['rating'] == 5
+        assert len(titles[0]['genre']) == 2
+
+    def test_filters(self, admin_client, catalogue):
+        titles = self.read_lines(admin_client.get(f'{URL}?year=2003'))
+        assert [title['year'] for title in titles] == [2003]
+        assert self.read_lines(admin_client.get(f'{URL}?year=1900')) == []
@@ -0,0 +1,52 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleStats:
+
+    def get_stats(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id}/stats/')
+        assert response.status_code == 200
+        return response.json()
+
+    def test_stats(self, client, catalogue, django_user_model):
+        from reviews.models import Review
+
+        title = catalogue['title']
+        Review.objects.filter(title=title).delete()
+        for i, score in enumerate((1, 4, 4, 9)):
+            author = django_user_model.objects.create_user(
+                username=f'critic{i}', email=f'critic{i}@yamdb.fake'
+            )
+            Review.objects.create(title=title, author=author, score=score)
+
+        stats = self.get_stats(client, title)
+
+        assert stats['count'] == 4
+        assert stats['mean'] == 4.5
+        assert stats['median'] == 4
+        assert stats['histogram'] == {
+            '1': 1, '2': 0, '3': 0, '4': 2, '5': 0,
+            '6': 0, '7': 0, '8': 0, '9': 1, '10': 0,
+        }
+
+    def test_empty_and_missing(self, client, catalogue):
+        from reviews.models import Title
+
+        title = Title.objects.exclude(pk=catalogue['title'].pk).first()
+        stats = self.get_stats(client, title)
+        assert stats['count'] == 0
+        assert stats['mean'] is None and stats['median'] is None
+        assert client.get('/api/v1/titles/0/stats/').status_code == 404
+
+    def test_cached_until_review_write(self, client, catalogue,
+                                       django_assert_num_queries):
+        title = catalogue['title']
+        assert self.get_stats(client, title)['count'] == 10
+        with django_assert_num_queries(0):
+            self.get_stats(client, title)
+
+        title.reviews.first().delete()
+        assert self.get_stats(client, title)['count'] == 9, (
+            'Проверьте, что статистика обновляется после изменения отзывов'
+        )